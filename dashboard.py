@@ -1,14 +1,13 @@
 import streamlit as st
-import pandas as pd # Rebuild trigger: Final stability push v3
 import plotly.express as px
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
-import requests
-from sklearn.linear_model import LinearRegression
-import joblib
-import os
 import numpy as np
+from utils import dashboard_data
+from utils.cube import ensure_cube
+from utils.dashboard_data import FORECAST_YEARS
+from utils.downsample import downsample, linear_fit
+from utils.geo import FEATURE_KEYS, load_geojson
+from utils.inference import InferenceService, artifacts_version
 
 # Page configuration
 st.set_page_config(
@@ -102,80 +101,84 @@ with col_t2:
     st.title("AadhaarPulse™ Strategic Analytics")
     st.markdown("##### Empowering Data-Driven Governance for UIDAI")
 
-# Load all datasets with caching
+# Fingerprint of the processed tables; keys every cache derived from them
+cube_version = ensure_cube()
+
+# Load all datasets with caching; state names are normalized (and rows without a state
+# dropped) inside the cached load, once per distinct state and data version
 @st.cache_data
-def load_all_data():
-    geo_df = pd.read_csv('processed_data/geographic_data.csv')
-    age_df = pd.read_csv('processed_data/age_demographics_data.csv')
-    update_df = pd.read_csv('processed_data/update_behavior_data.csv')
-    anomaly_df = pd.read_csv('processed_data/anomaly_detection_data.csv')
-    predictive_df = pd.read_csv('processed_data/predictive_data.csv')
-    pincode_df = pd.read_csv('processed_data/pincode_data.csv')
-    return geo_df, age_df, update_df, anomaly_df, predictive_df, pincode_df
-
-# Clean state names
-def clean_state(state):
-    if pd.isna(state): 
-        return None
-    s = str(state).strip()
-    s = s.replace(' & ', ' and ')
-    if s == 'Orissa': 
-        return 'Odisha'
-    if s in ['Dadra and Nagar Haveli', 'Daman and Diu']:
-        return 'Dadra and Nagar Haveli and Daman and Diu'
-    return s
-
-geo_df, age_df, update_df, anomaly_df, predictive_df, pincode_df = load_all_data()
-
-# Normalize all dataframes
-for df in [geo_df, age_df, update_df, anomaly_df, predictive_df, pincode_df]:
-    df['state_clean'] = df['state'].apply(clean_state)
-
-# Remove nulls
-geo_df = geo_df[geo_df['state_clean'].notna()]
-age_df = age_df[age_df['state_clean'].notna()]
-update_df = update_df[update_df['state_clean'].notna()]
-anomaly_df = anomaly_df[anomaly_df['state_clean'].notna()]
-predictive_df = predictive_df[predictive_df['state_clean'].notna()]
-pincode_df = pincode_df[pincode_df['state_clean'].notna()]
+def load_all_data(version):
+    return dashboard_data.load_tables()
+
+# State/district rollups the pages chart, precomputed by utils/cube.py. `version` is the
+# source tables' fingerprint, so the cache refreshes when the data does.
+@st.cache_data
+def load_cube_tables(version):
+    return dashboard_data.load_cube_tables()
+
+geo_df, age_df, update_df, anomaly_df, predictive_df, pincode_df = load_all_data(cube_version)
+cube = load_cube_tables(cube_version)
 
 # --- Global Helper Functions & Data ---
 
+def state_geojson():
+    """State boundaries from the local GeoJSON store (read once per process, never fetched)."""
+    try:
+        return load_geojson('state')
+    except FileNotFoundError as e:
+        st.warning(f"⚠️ {e}")
+        return None
+
+# Scatter plots: a bounded, downsampled set of points (flagged rows and outliers always
+# kept) and a trend line fitted over every row, both computed once per data version
+@st.cache_data
+def scatter_points(version, name, _df, x, y, keep=None):
+    return downsample(_df, x, y, keep)
+
 @st.cache_data
-def fetch_geojson():
-    url = "https://raw.githubusercontent.com/geohacker/india/master/state/india_state.geojson"
-    response = requests.get(url)
-    return response.json()
-
-# Alias for pop geojson (can be same or different if needed)
-fetch_geojson_pop = fetch_geojson
-
-pop_data = {
-    'Uttar Pradesh': 241.1, 'Bihar': 136.0, 'Maharashtra': 127.1, 'West Bengal': 99.8,
-    'Madhya Pradesh': 88.4, 'Rajasthan': 82.9, 'Tamil Nadu': 77.5, 'Gujarat': 74.4,
-    'Karnataka': 69.5, 'Andhra Pradesh': 53.3, 'Odisha': 47.0, 'Jharkhand': 41.3,
-    'Telangana': 38.4, 'Kerala': 36.0, 'Assam': 36.0, 'Punjab': 31.0, 'Haryana': 30.5,
-    'Chhattisgarh': 30.5, 'Delhi': 20.4, 'Jammu and Kashmir': 13.8, 'Uttarakhand': 11.8,
-    'Himachal Pradesh': 7.5, 'Tripura': 4.1, 'Meghalaya': 3.4, 'Manipur': 3.3,
-    'Nagaland': 2.1, 'Goa': 1.6, 'Arunachal Pradesh': 1.5, 'Puducherry': 1.6,
-    'Chandigarh': 1.2, 'Mizoram': 1.2, 'Sikkim': 0.69
-}
+def trend_fit(version, name, _df, x, y):
+    return linear_fit(_df[x], _df[y])
+
+def scatter_frame(name, df, x, y, keep=None):
+    if render_all_points:
+        return df
+    return scatter_points(cube_version, name, df, x, y, keep)
 
+# Service gaps: updates above what the enrollment base predicts, per state, district or
+# pincode rollup, fitted and ranked once per data version (largest gap first)
+@st.cache_data
+def service_gaps(version, grain):
+    return dashboard_data.service_gaps(grain)
+
+def add_trendline(fig, name, df, x, y):
+    fit = trend_fit(cube_version, name, df, x, y)
+    x_range = np.array([df[x].min(), df[x].max()], dtype=float)
+    fig.add_trace(go.Scatter(x=x_range, y=fit['intercept'] + fit['slope'] * x_range, mode='lines',
+                             name=f"OLS fit (R² = {fit['r2']:.2f})", line=dict(color='#f72585')))
+
+# Pincode drill-down index, built once per data version and shared by every session as is
+# (a cache_resource, so lookups are not handed a pickled copy of the whole index)
+@st.cache_resource
+def pincode_index(version):
+    return dashboard_data.load_pincode_index()
+
+# Keyed on the artifacts' file stats, so models retrained by 10_ml_training.py are loaded afresh
 @st.cache_resource(ttl=3600) # Added TTL to force refresh
-def load_models():
-    model_demand, model_infra, model_spike, le_state = None, None, None, None
-    try:
-        if os.path.exists('models/demand_forecaster.joblib'):
-            model_demand = joblib.load('models/demand_forecaster.joblib')
-        if os.path.exists('models/infra_optimizer.joblib'):
-            model_infra = joblib.load('models/infra_optimizer.joblib')
-        if os.path.exists('models/spike_warning.joblib'):
-            model_spike = joblib.load('models/spike_warning.joblib')
-        if os.path.exists('models/state_encoder.joblib'):
-            le_state = joblib.load('models/state_encoder.joblib')
-    except Exception as e:
-        st.error(f"Error loading models: {e}")
-    return model_demand, model_infra, model_spike, le_state
+def load_inference(models):
+    return InferenceService()
+
+@st.cache_data(ttl=600)
+def model_problems(version, models):
+    """Missing or stale model artifacts per the training manifest (nothing is unpickled)."""
+    return load_inference(models).stale()
+
+def state_inputs(states):
+    return dashboard_data.state_inputs(cube, states)
+
+@st.cache_data
+def demand_projection(version, models, _service):
+    """Demand for every state and forecast year, scored in one batched call per data and model version."""
+    return dashboard_data.demand_projection(cube, _service)
 
 # Sidebar navigation
 st.sidebar.header("📊 Analysis Modules")
@@ -192,6 +195,8 @@ page = st.sidebar.radio("Select Analysis", [
     "👥 Population Penetration",
     "🤖 Strategic ML Insights"
 ])
+render_all_points = st.sidebar.toggle("Render every scatter point", value=False,
+                                      help="Off: a downsampled view that always keeps anomalies and outliers")
 
 # Page 0: Overview
 if page == "🏠 Overview":
@@ -199,10 +204,10 @@ if page == "🏠 Overview":
     
     col1, col2, col3, col4 = st.columns(4)
     
-    total_enrollments = geo_df['total_enrollments'].sum()
-    total_updates = geo_df['total_updates'].sum()
-    unique_states = geo_df['state_clean'].nunique()
-    unique_districts = geo_df['district'].nunique()
+    summary = dashboard_data.overview(cube)
+    total_enrollments = summary['total_enrollments']
+    total_updates = summary['total_updates']
+    unique_districts = summary['unique_districts']
     
     with col1:
         st.metric("Total Enrollments", f"{total_enrollments/1000000:.2f}M", help="Total identities generated")
@@ -220,7 +225,7 @@ if page == "🏠 Overview":
     with col_c1:
         st.markdown('<div class="insight-card"><b>💡 Core Insight:</b> India has transitioned from an "Enrollment Phase" (95%+ saturation) to a <b>"Maintenance Phase"</b> where update services are the primary driver of operational load.</div>', unsafe_allow_html=True)
         # Top states chart
-        state_data = geo_df.groupby('state_clean')['total_enrollments'].sum().sort_values(ascending=False).head(10)
+        state_data = summary['top_states']
         fig = px.bar(x=state_data.values, y=state_data.index, orientation='h',
                      labels={'x': 'Enrollment Volume', 'y': ''},
                      title='Top 10 States by Enrollment Volume',
@@ -257,7 +262,7 @@ elif page == "🗺️ Geographic Analysis":
     col_g1, col_g2 = st.columns(2)
     with col_g1:
         st.markdown("### 🏘️ District-Level Distribution")
-        dist_data = geo_df.groupby('district')['total_enrollments'].sum().sort_values(ascending=False).head(10)
+        dist_data = dashboard_data.top_districts(cube)
         fig = px.bar(x=dist_data.values, y=dist_data.index, orientation='h',
                      labels={'x': 'Total Volume', 'y': ''},
                      title='Top 10 Districts (Micro-Level)',
@@ -269,13 +274,14 @@ elif page == "🗺️ Geographic Analysis":
     
     with col_g2:
         st.markdown("### 🔗 Correlation Analysis")
-        fig = px.scatter(geo_df, x='total_enrollments', y='total_updates',
+        points = scatter_frame('geographic_data', geo_df, 'total_enrollments', 'total_updates')
+        fig = px.scatter(points, x='total_enrollments', y='total_updates',
                          hover_data=['state_clean', 'district'],
                          opacity=0.6,
-                         trendline='ols',
                          template=TEMPLATE,
                          color_discrete_sequence=['#4361ee'],
                          labels={'total_enrollments': 'Enrollments', 'total_updates': 'Updates'})
+        add_trendline(fig, 'geographic_data', geo_df, 'total_enrollments', 'total_updates')
         st.plotly_chart(fig, width='stretch')
 
 # Page 2: Age Demographics
@@ -284,10 +290,10 @@ elif page == "👶 Age Demographics":
     
     st.markdown('<div class="insight-card"><b>Policy Lens:</b> 85%+ are Adults (18+), but <b>Children (0-17)</b> represent the most volatile growth area for biometric integrity and verification updates.</div>', unsafe_allow_html=True)
 
+    totals, update_types = dashboard_data.age_profile(age_df)
     col_a1, col_a2 = st.columns(2)
     with col_a1:
         st.markdown("### 🥧 Enrollment Share")
-        totals = age_df[['age_0_5', 'age_5_17', 'age_18_greater']].sum()
         fig = px.pie(values=totals.values, names=['0-5 yrs', '5-17 yrs', '18+ yrs'],
                      hole=0.4,
                      color_discrete_sequence=['#4cc9f0', '#4895ef', '#4361ee'],
@@ -296,11 +302,6 @@ elif page == "👶 Age Demographics":
     
     with col_a2:
         st.markdown("### 📊 Update Demand by Cohort")
-        update_types = pd.DataFrame({
-            'Age Group': ['Youth (5-17)', 'Adults (17+)'],
-            'Demographic': [age_df['demo_age_5_17'].sum(), age_df['demo_age_17_'].sum()],
-            'Biometric': [age_df['bio_age_5_17'].sum(), age_df['bio_age_17_'].sum()]
-        })
         fig = px.bar(update_types, x='Age Group', y=['Demographic', 'Biometric'],
                      barmode='group',
                      color_discrete_sequence=['#4361ee', '#4cc9f0'],
@@ -313,10 +314,10 @@ elif page == "🔄 Update Behavior":
     
     st.markdown('<div class="insight-card"><b>Strategic View:</b> Demographic updates (60%) dominate the system. High intensity in urban pockets suggests a mobile population that frequently changes addresses/phone numbers.</div>', unsafe_allow_html=True)
 
+    totals, top_districts = dashboard_data.update_intensity(cube)
     col_u1, col_u2 = st.columns([1, 2])
     with col_u1:
         st.markdown("### 🥧 Distribution")
-        totals = [update_df['total_demo_updates'].sum(), update_df['total_bio_updates'].sum()]
         fig = px.pie(values=totals, names=['Demographic', 'Biometric'],
                      color_discrete_sequence=['#f72585', '#7209b7'],
                      template=TEMPLATE)
@@ -324,7 +325,6 @@ elif page == "🔄 Update Behavior":
     
     with col_u2:
         st.markdown("### 🔝 Intensity Leaders (District)")
-        top_districts = update_df.groupby('district')['update_to_enrollment_ratio'].mean().sort_values(ascending=False).head(15)
         fig = px.bar(x=top_districts.values, y=top_districts.index, orientation='h',
                      labels={'x': 'Update Ratio', 'y': ''},
                      color=top_districts.values,
@@ -337,15 +337,14 @@ elif page == "🔄 Update Behavior":
 elif page == "🚨 Anomaly Detection":
     st.subheader("🚨 Risk Monitoring & Anomaly Detection")
     
-    st.error(f"⚠️ {anomaly_df['is_enr_anomaly'].sum() + anomaly_df['is_demo_anomaly'].sum()} Anomalous activity clusters detected across India.")
+    flagged, filtered_data = dashboard_data.anomaly_outliers(cube, anomaly_df)
+    st.error(f"⚠️ {flagged} Anomalous activity clusters detected across India.")
     
     st.markdown('<div class="insight-card"><b>Security Lens:</b> Districts with Activity > 3 Std. Dev. are potential targets for data breach, identity farming, or massive internal migration surges.</div>', unsafe_allow_html=True)
 
     col_an1, col_an2 = st.columns(2)
     with col_an1:
         st.markdown("### 📦 State-Level Outliers")
-        top_states = anomaly_df.groupby('state_clean')['total_enrollments'].sum().nlargest(12).index
-        filtered_data = anomaly_df[anomaly_df['state_clean'].isin(top_states)]
         fig = px.box(filtered_data, x='state_clean', y='total_enrollments',
                      color_discrete_sequence=['#4361ee'],
                      template=TEMPLATE)
@@ -354,7 +353,9 @@ elif page == "🚨 Anomaly Detection":
     
     with col_an2:
         st.markdown("### 🧿 Anomaly Clustering (Z-Score)")
-        fig = px.scatter(anomaly_df, x='enr_z_score', y='demo_z_score',
+        points = scatter_frame('anomaly_detection_data', anomaly_df, 'enr_z_score', 'demo_z_score',
+                               keep=['is_enr_anomaly', 'is_demo_anomaly'])
+        fig = px.scatter(points, x='enr_z_score', y='demo_z_score',
                          color='is_enr_anomaly',
                          color_discrete_map={True: '#f72585', False: '#4361ee'},
                          hover_data=['state_clean', 'district'],
@@ -368,27 +369,26 @@ elif page == "🔮 Predictive Analytics":
     
     st.markdown('<div class="insight-card"><b>Forecast Engine:</b> Using Linear Regression (R² = 0.62), we can correlate enrollment bases with future update demand. Districts in <b>Red</b> are currently underserved compared to their predicted load.</div>', unsafe_allow_html=True)
 
-    predictive_df['total_updates'] = predictive_df['total_demo_updates'] + predictive_df['total_bio_updates']
-    
     col_p1, col_p2 = st.columns([1, 1])
     with col_p1:
         st.markdown("### 📈 Demand Regression")
-        fig = px.scatter(predictive_df, x='total_enrollments', y='total_updates',
+        points = scatter_frame('predictive_data', predictive_df, 'total_enrollments', 'total_updates')
+        fig = px.scatter(points, x='total_enrollments', y='total_updates',
                          hover_data=['state_clean', 'district'],
-                         trendline='ols',
                          template=TEMPLATE,
                          color_discrete_sequence=['#4361ee'],
                          opacity=0.4)
+        add_trendline(fig, 'predictive_data', predictive_df, 'total_enrollments', 'total_updates')
         st.plotly_chart(fig, width='stretch')
     
     with col_p2:
-        st.markdown("### 📊 Top 10 Service Gaps")
-        X = predictive_df[['total_enrollments']].values
-        y = predictive_df['total_updates'].values
-        model = LinearRegression().fit(X, y)
-        predictive_df['residual'] = y - model.predict(X)
-        top_res = predictive_df.nlargest(10, 'residual')[['state_clean', 'district', 'residual']]
-        fig = px.bar(top_res, x='residual', y='district', orientation='h',
+        gap_grain = st.radio("Grain", ['district', 'state', 'pincode'], horizontal=True, format_func=str.title)
+        top_n = st.slider("Top N", 5, 30, 10)
+        st.markdown(f"### 📊 Top {top_n} Service Gaps")
+        top_res = service_gaps(cube_version, gap_grain).head(top_n)
+        fig = px.bar(top_res, x='residual', y='label', orientation='h',
+                     hover_data=['state_clean', 'total_updates', 'predicted_updates'],
+                     labels={'label': ''},
                      color='residual', color_continuous_scale='Reds', template=TEMPLATE)
         fig.update_layout(showlegend=False)
         st.plotly_chart(fig, width='stretch')
@@ -399,30 +399,59 @@ elif page == "📍 Pincode Analysis":
     
     st.markdown('<div class="insight-card"><b>Micro-Analysis:</b> The majority of pincodes show low volume, but the <b>Top 5% (Power Users)</b> drive 40% of the national activity. Operations should be optimized for these high-density hubs.</div>', unsafe_allow_html=True)
 
-    pincode_df['total_activity'] = pincode_df[['age_0_5', 'age_5_17', 'age_18_greater']].sum(axis=1)
-    
-    fig = px.histogram(pincode_df, x='total_activity', nbins=100,
-                       template=TEMPLATE, color_discrete_sequence=['#3a0ca3'],
-                       labels={'total_activity': 'Activity per Pincode'})
+    # Binned here, so the browser gets 100 bars instead of every pincode's value
+    counts, edges = dashboard_data.activity_histogram(pincode_df)
+    fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts,
+                 template=TEMPLATE, color_discrete_sequence=['#3a0ca3'],
+                 labels={'x': 'Activity per Pincode', 'y': 'count'})
+    fig.update_traces(width=np.diff(edges))
     st.plotly_chart(fig, width='stretch')
 
+    st.markdown("### 🔎 Catchment Drill-Down")
+    index = pincode_index(cube_version)
+    query = st.text_input("Search", placeholder="Pincode, postal prefix (e.g. 11) or district name",
+                          help="Digits match every pincode starting with them; text matches district names")
+    if query.strip():
+        rows = index.search(query)
+        scope = f"matches for '{query.strip()}'"
+    else:
+        col_d1, col_d2 = st.columns(2)
+        sel_state = col_d1.selectbox("State", index.states())
+        sel_district = col_d2.selectbox("District", ["All districts"] + index.districts(sel_state))
+        if sel_district == "All districts":
+            rows, scope = index.state(sel_state), sel_state
+        else:
+            rows, scope = index.district(sel_state, sel_district), f"{sel_district}, {sel_state}"
+    
+    if rows.empty:
+        st.info(f"No pincodes found for '{query.strip()}'.")
+    else:
+        totals, top = dashboard_data.catchment(rows)
+        col_k1, col_k2, col_k3 = st.columns(3)
+        col_k1.metric("Pincodes", f"{totals['pincodes']:,}")
+        col_k2.metric("Enrollments", f"{totals['total_enrollments']:,}")
+        col_k3.metric("Updates", f"{totals['total_updates']:,}")
+        fig = px.bar(top, x='total_activity', y='label', orientation='h',
+                     hover_data=['state_clean', 'total_enrollments', 'total_updates'],
+                     title=f"Most Active Pincodes: {scope}",
+                     labels={'label': '', 'total_activity': 'Activity'},
+                     color='total_activity', color_continuous_scale='Purples', template=TEMPLATE)
+        fig.update_layout(showlegend=False, yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig, width='stretch')
+
 # Page 7: Advanced Insights
 elif page == "🧠 Advanced Insights":
     st.subheader("🧠 Strategic Relationship Mapping")
     
+    corr, st_idx = dashboard_data.relationships(pincode_df)
     col_adv1, col_adv2 = st.columns(2)
     with col_adv1:
         st.markdown("### 🔥 Metric Correlation")
-        mapping = {'age_0_5': 'Child', 'age_5_17': 'Youth', 'age_18_greater': 'Adult', 
-                   'demo_age_5_17': 'Demo_Y', 'demo_age_17_': 'Demo_A', 'bio_age_5_17': 'Bio_Y', 'bio_age_17_': 'Bio_A'}
-        corr = pincode_df[list(mapping.keys())].rename(columns=mapping).corr()
         fig = px.imshow(corr, text_auto='.2f', color_continuous_scale='RdBu_r', template=TEMPLATE)
         st.plotly_chart(fig, width='stretch')
     
     with col_adv2:
         st.markdown("### ⚖️ State Service Index")
-        pincode_df['u_idx'] = (pincode_df['demo_age_5_17'] + pincode_df['demo_age_17_']) / (pincode_df['bio_age_5_17'] + pincode_df['bio_age_17_'] + 1)
-        st_idx = pincode_df.groupby('state_clean')['u_idx'].mean().sort_values()
         fig = px.bar(x=st_idx.values, y=st_idx.index, orientation='h', color=st_idx.values, color_continuous_scale='Teal', template=TEMPLATE)
         fig.add_vline(x=1, line_dash='dash', line_color='red')
         st.plotly_chart(fig, width='stretch')
@@ -431,41 +460,39 @@ elif page == "🧠 Advanced Insights":
 elif page == "🌍 Geographic Heatmaps":
     st.subheader("🌍 National GIS Heatmaps")
     
-    india_geojson = fetch_geojson()
-    state_metrics = geo_df.groupby('state_clean').agg({'total_enrollments': 'sum', 'total_updates': 'sum'}).reset_index()
-    
-    tab_h1, tab_h2 = st.tabs(["Enrollment Intensity", "Update Intensity"])
-    with tab_h1:
-        fig = px.choropleth(state_metrics, geojson=india_geojson, featureidkey='properties.NAME_1',
-                            locations='state_clean', color='total_enrollments', color_continuous_scale="Purp", template=TEMPLATE)
-        fig.update_geos(fitbounds="locations", visible=False)
-        st.plotly_chart(fig, width='stretch')
-    with tab_h2:
-        fig = px.choropleth(state_metrics, geojson=india_geojson, featureidkey='properties.NAME_1',
-                            locations='state_clean', color='total_updates', color_continuous_scale="OrRd", template=TEMPLATE)
-        fig.update_geos(fitbounds="locations", visible=False)
-        st.plotly_chart(fig, width='stretch')
+    india_geojson = state_geojson()
+    state_metrics = cube['geo_state']
+    
+    if india_geojson is not None:
+        tab_h1, tab_h2 = st.tabs(["Enrollment Intensity", "Update Intensity"])
+        with tab_h1:
+            fig = px.choropleth(state_metrics, geojson=india_geojson, featureidkey=FEATURE_KEYS['state'],
+                                locations='state_clean', color='total_enrollments', color_continuous_scale="Purp", template=TEMPLATE)
+            fig.update_geos(fitbounds="locations", visible=False)
+            st.plotly_chart(fig, width='stretch')
+        with tab_h2:
+            fig = px.choropleth(state_metrics, geojson=india_geojson, featureidkey=FEATURE_KEYS['state'],
+                                locations='state_clean', color='total_updates', color_continuous_scale="OrRd", template=TEMPLATE)
+            fig.update_geos(fitbounds="locations", visible=False)
+            st.plotly_chart(fig, width='stretch')
 
 # Page 9: Population Penetration
 elif page == "👥 Population Penetration":
     st.subheader("👥 Population-Normalized Penetration")
     
-    state_activity = geo_df.groupby('state_clean')[['total_enrollments', 'total_updates']].sum().reset_index()
-    state_activity['total_activity'] = state_activity['total_enrollments'] + state_activity['total_updates']
-    state_activity['pop_m'] = state_activity['state_clean'].map(pop_data)
-    state_activity = state_activity.dropna(subset=['pop_m'])
-    state_activity['per_1000'] = (state_activity['total_activity'] / (state_activity['pop_m'] * 1000000)) * 1000
+    state_activity = dashboard_data.penetration(cube)
     
     col_pop1, col_pop2 = st.columns([2, 1])
     with col_pop1:
-        india_geojson = fetch_geojson_pop()
-        fig = px.choropleth(state_activity, geojson=india_geojson, featureidkey='properties.NAME_1',
-                            locations='state_clean', color='per_1000', color_continuous_scale="Viridis", template=TEMPLATE)
-        fig.update_geos(fitbounds="locations", visible=False)
-        st.plotly_chart(fig, width='stretch')
+        india_geojson = state_geojson()
+        if india_geojson is not None:
+            fig = px.choropleth(state_activity, geojson=india_geojson, featureidkey=FEATURE_KEYS['state'],
+                                locations='state_clean', color='activity_per_1000', color_continuous_scale="Viridis", template=TEMPLATE)
+            fig.update_geos(fitbounds="locations", visible=False)
+            st.plotly_chart(fig, width='stretch')
     with col_pop2:
-        top_pop = state_activity.sort_values('per_1000', ascending=True)
-        fig = px.bar(top_pop, x='per_1000', y='state_clean', orientation='h', color='per_1000', color_continuous_scale='Viridis', template=TEMPLATE)
+        top_pop = state_activity.sort_values('activity_per_1000', ascending=True)
+        fig = px.bar(top_pop, x='activity_per_1000', y='state_clean', orientation='h', color='activity_per_1000', color_continuous_scale='Viridis', template=TEMPLATE)
         fig.update_layout(showlegend=False, height=700)
         st.plotly_chart(fig, width='stretch')
 
@@ -476,48 +503,64 @@ elif page == "🤖 Strategic ML Insights":
     st.markdown('<div class="insight-card"><b>Agentic AI Layer:</b> These models provide predictive guardrails for UIDAI decision-makers, moving beyond descriptive stats into <b>Prescriptive Governance</b>.</div>', unsafe_allow_html=True)
 
     try:
-        model_demand, model_infra, model_spike, le_state = load_models()
+        models_version = artifacts_version()
+        service = load_inference(models_version)
+        stale = {name: reason for name, reason in model_problems(cube_version, models_version).items()
+                 if reason != 'missing'}
+        if stale:
+            st.warning("⚠️ Retrain with 10_ml_training.py; stale models: " +
+                       "; ".join(f"{name} ({reason})" for name, reason in stale.items()))
+        # Only now, with the page open, load every model at once
+        service.preload()
         
         t1, t2, t3 = st.tabs(["📈 Future Forecast", "🏥 Infrastructure", "🚩 Risk/Spike Warning"])
     
         with t1:
-            if model_demand is None:
+            if not service.available('demand'):
                 st.warning("⚠️ Demand Forecaster model not found. Please ensure `models/demand_forecaster.joblib` exists.")
             else:
                 c1, c2 = st.columns(2)
-                sel_state = c1.selectbox("Region", sorted(le_state.classes_))
-                t_year = c2.slider("Forecast Year", 2025, 2030, 2025)
+                sel_state = c1.selectbox("Region", service.states)
+                t_year = c2.slider("Forecast Year", FORECAST_YEARS[0], FORECAST_YEARS[-1], FORECAST_YEARS[0])
                 
                 # Dynamic defaults based on state
-                curr_pop = float(geo_df[geo_df['state_clean'] == sel_state]['total_enrollments'].sum() / 1000000 * 1.05)
-                curr_enr = int(geo_df[geo_df['state_clean'] == sel_state]['total_enrollments'].sum())
+                defaults = state_inputs([sel_state]).iloc[0]
+                curr_pop = float(defaults['pop_millions'])
+                curr_enr = int(defaults['total_enrollments'])
                 
                 pop_in = c1.number_input("Projected Population (Millions)", value=curr_pop, step=0.1)
                 enr_in = c2.number_input("Current Enrollment Base", value=curr_enr, step=1000)
                 
-                X_in = pd.DataFrame({'state_enc': [le_state.transform([sel_state])[0]], 'pop_millions': [pop_in], 'year': [t_year], 'total_enrollments': [enr_in]})
-                pred = model_demand.predict(X_in)[0]
+                pred = service.predict_one('demand', state=sel_state, pop_millions=pop_in, year=t_year, total_enrollments=enr_in)
                 st.metric(f"Predicted Demand ({t_year})", f"{pred:,.0f} Updates", f"Budget: ₹{pred*50/1000000:.2f}M")
             
+                st.markdown(f"### 🗓️ Projection Grid ({FORECAST_YEARS[0]}-{FORECAST_YEARS[-1]})")
+                projection = demand_projection(cube_version, models_version, service)
+                fig = px.imshow(projection, aspect='auto', color_continuous_scale='Blues', template=TEMPLATE,
+                                labels={'x': 'Forecast Year', 'y': '', 'color': 'Predicted Updates'})
+                fig.update_layout(height=800)
+                st.plotly_chart(fig, width='stretch')
+            
         with t2:
-            if model_infra is None:
+            if not service.available('infra'):
                 st.warning("⚠️ Infrastructure Optimizer model not found.")
             else:
                 c3, c4 = st.columns(2)
-                sel_infra = c3.selectbox("Region for Infra", sorted(le_state.classes_), key='inf_st')
+                sel_infra = c3.selectbox("Region for Infra", service.states, key='inf_st')
                 
                 # Dynamic defaults
-                def_pop = float(geo_df[geo_df['state_clean'] == sel_infra]['total_enrollments'].sum() / 1000000)
-                def_upd = int(geo_df[geo_df['state_clean'] == sel_infra]['total_updates'].sum())
+                defaults = state_inputs([sel_infra]).iloc[0]
+                def_pop = float(defaults['total_enrollments'] / 1000000)
+                def_upd = int(defaults['total_updates'])
                 
                 pop_inf = c3.number_input("Population (Millions)", value=def_pop, key='inf_pop')
                 upd_inf = c4.number_input("Annual Update Volume", value=def_upd, key='inf_upd')
                 
-                rec = model_infra.predict(pd.DataFrame({'state_enc': [le_state.transform([sel_infra])[0]], 'pop_millions': [pop_inf], 'total_updates': [upd_inf]}))[0]
+                rec = service.predict_one('infra', state=sel_infra, pop_millions=pop_inf, total_updates=upd_inf)
                 st.metric("Recommended Centers (ASKs)", f"{int(rec)} Unit(s)", "Optimal Capacity")
             
         with t3:
-            if model_spike is None:
+            if not service.available('spike'):
                 st.warning("⚠️ Spike Warning model not found.")
             else:
                 c5, c6, c7 = st.columns(3)
@@ -525,7 +568,7 @@ elif page == "🤖 Strategic ML Insights":
                 dz = c6.slider("Update Z-Score", 0.0, 5.0, 1.0)
                 total_e = c7.number_input("Daily Enrollments", value=1000, step=100)
                 
-                prob = model_spike.predict_proba(pd.DataFrame({'enr_z_score': [ez], 'demo_z_score': [dz], 'total_enrollments': [total_e]}))[0][1]
+                prob = service.predict_one('spike', enr_z_score=ez, demo_z_score=dz, total_enrollments=total_e)
                 st.metric("Spike Probability", f"{prob*100:.1f}%")
                 
                 if prob > 0.7: 
@@ -3,106 +3,229 @@ import numpy as np
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.linear_model import Ridge
 from sklearn.preprocessing import LabelEncoder
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
 import joblib
+import json
 import os
-
-# Ensure directories exist
-os.makedirs('models', exist_ok=True)
-os.makedirs('processed_data', exist_ok=True)
-
-print("🚀 Starting ML Model Training Pipeline...")
-
-# 1. Load Data
-geo_df = pd.read_csv('processed_data/geographic_data.csv')
-anomaly_df = pd.read_csv('processed_data/anomaly_detection_data.csv')
-predictive_df = pd.read_csv('processed_data/predictive_data.csv')
-
-# Population data for normalization
-pop_data = {
-    'Uttar Pradesh': 241.1, 'Bihar': 136.0, 'Maharashtra': 127.1, 'West Bengal': 99.8,
-    'Madhya Pradesh': 88.4, 'Rajasthan': 82.9, 'Tamil Nadu': 77.5, 'Gujarat': 74.4,
-    'Karnataka': 69.5, 'Andhra Pradesh': 53.3, 'Odisha': 47.0, 'Jharkhand': 41.3,
-    'Telangana': 38.4, 'Kerala': 36.0, 'Assam': 36.0, 'Punjab': 31.0, 'Haryana': 30.5,
-    'Chhattisgarh': 30.5, 'Delhi': 20.4, 'Jammu and Kashmir': 13.8, 'Uttarakhand': 11.8,
-    'Himachal Pradesh': 7.5, 'Tripura': 4.1, 'Meghalaya': 3.4, 'Manipur': 3.3,
-    'Nagaland': 2.1, 'Goa': 1.6, 'Arunachal Pradesh': 1.5, 'Puducherry': 1.6,
-    'Chandigarh': 1.2, 'Mizoram': 1.2, 'Sikkim': 0.69
-}
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath('.'))
+from utils.data_loader import load_processed
+from utils.metrics import add_metrics
+from utils.population import POPULATION_FILE, population_of
+from utils.inference import (ARTIFACTS, MODEL_DIR, check_artifacts, load_manifest, save_artifact,
+                             write_manifest)
+
+MONTHLY_COLUMNS = ['month', 'state', 'district', 'age_0_5', 'age_5_17', 'age_18_greater',
+                   'demo_age_5_17', 'demo_age_17_', 'bio_age_5_17', 'bio_age_17_']
+
+# When only new months arrived, the demand forest grows by this many trees instead of being
+# retrained. The added trees are fitted on every month, but the older trees never saw the new
+# ones, which are therefore under-weighted until the next full fit; after MAX_WARM_STARTS
+# rounds in a row the forest is retrained from scratch
+WARM_START_TREES = 20
+MAX_WARM_STARTS = 3
+
+# Per-run cost of every model (seconds, peak memory), appended for the nightly history
+TRAINING_LOG = os.path.join(MODEL_DIR, 'training_log.jsonl')
+
+def code_hash():
+    """Models are retrained when this script, the metric formulas or the reference population
+    change, even if their data did not."""
+    # Modules are read next to this script, the reference table from the data root (the cwd)
+    code_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+    digest = hashlib.sha256()
+    for path in (os.path.abspath(__file__), os.path.join(code_root, 'utils', 'metrics.py'),
+                 os.path.join(code_root, 'utils', 'population.py'), POPULATION_FILE):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def history_hash(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+def demand_frame():
+    # Real per-month history from the ingestion rollups, one row per district and month
+    monthly_df = load_processed('monthly_pincode_data', columns=MONTHLY_COLUMNS)
+    df1 = monthly_df.groupby(['state', 'district', 'month'], observed=True).sum(numeric_only=True).reset_index()
+    add_metrics(df1, ['total_enrollments', 'total_updates'])
+    df1['pop_millions'] = population_of(df1['state'])
+    df1['state'] = df1['state'].astype(str)
+    df1 = df1.dropna(subset=['pop_millions'])
+    
+    # Time as a fractional year (month 1 = .0), matching the dashboard's "Forecast Year" input
+    df1['year'] = df1['month'].dt.year + (df1['month'].dt.month - 1) / 12
+    return df1
+
+def fit_encoder():
+    states = load_processed('monthly_pincode_data', columns=['state'])['state']
+    le = LabelEncoder()
+    le.fit(states[pd.notna(population_of(states))].astype(str))
+    return le
 
 # --- MODEL 1: Future Demand Forecaster ---
-print("📦 Training Model 1: Future Demand Forecaster...")
-df1 = predictive_df.copy()
-df1['pop_millions'] = df1['state'].map(pop_data)
-df1 = df1.dropna(subset=['pop_millions'])
-
-# Prepare features
-le = LabelEncoder()
-df1['state_enc'] = le.fit_transform(df1['state'])
-
-# Synthetic "Year" data for training (current=2024, historical=2023)
-# We duplicate data to simulate growth trends
-df_hist = df1.copy()
-df_hist['year'] = 2023
-df_hist['total_updates'] = (df1['total_demo_updates'] + df1['total_bio_updates']) * 0.9
-
-df_curr = df1.copy()
-df_curr['year'] = 2024
-df_curr['total_updates'] = (df1['total_demo_updates'] + df1['total_bio_updates'])
-
-df_ml = pd.concat([df_hist, df_curr])
-
-X1 = df_ml[['state_enc', 'pop_millions', 'year', 'total_enrollments']]
-y1 = df_ml['total_updates']
-
-model1 = RandomForestRegressor(n_estimators=100, random_state=42)
-model1.fit(X1, y1)
-
-joblib.dump(model1, 'models/demand_forecaster.joblib', compress=3)
-joblib.dump(le, 'models/state_encoder.joblib')
-
+def train_demand(le, n_jobs, previous):
+    print("📦 Training Model 1: Future Demand Forecaster...")
+    df1 = demand_frame()
+    df1['state_enc'] = le.transform(df1['state'])
+    features = ['state_enc', 'pop_millions', 'year', 'total_enrollments']
+    
+    # Warm start: the months the model has seen are unchanged and only later ones are new
+    through = previous.get('trained_through')
+    if through is not None and previous.get('classes') == list(le.classes_):
+        seen = df1['month'] <= pd.Timestamp(through)
+        if (history_hash(df1.loc[seen, features + ['total_updates']]) == previous.get('history')
+                and (~seen).any() and previous.get('warm_starts', 0) < MAX_WARM_STARTS):
+            model1 = joblib.load(os.path.join(MODEL_DIR, ARTIFACTS['demand']))
+            model1.set_params(warm_start=True, n_estimators=previous['trees'] + WARM_START_TREES, n_jobs=n_jobs)
+            model1.fit(df1[features], df1['total_updates'])
+            print(f"   Warm start: {WARM_START_TREES} trees on {len(df1)} rows ({(~seen).sum()} new)")
+            return model1, _demand_info(df1, features, model1, 'warm_start', previous.get('warm_starts', 0) + 1)
+    
+    X1 = df1[features]
+    y1 = df1['total_updates']
+    
+    model1 = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs)
+    model1.fit(X1, y1)
+    return model1, _demand_info(df1, features, model1, 'full')
+
+def _demand_info(df1, features, model1, mode, warm_starts=0):
+    through = df1['month'].max()
+    return {
+        'mode': mode,
+        'rows': len(df1),
+        'trees': len(model1.estimators_),
+        'warm_starts': warm_starts,
+        'trained_through': through.strftime('%Y-%m-%d'),
+        'history': history_hash(df1.loc[df1['month'] <= through, features + ['total_updates']])
+    }
 
 # --- MODEL 3: Infrastructure Optimizer ---
-print("🏗️ Training Model 3: Infrastructure Optimizer...")
-# Target: Optimal centers (derived: 1 center per 50k population + activity weight)
-df3 = geo_df.copy()
-df3['pop_millions'] = df3['state'].map(pop_data)
-df3 = df3.dropna(subset=['pop_millions'])
-
-# Features
-state_agg = df3.groupby('state').agg({
-    'total_enrollments': 'sum',
-    'total_updates': 'sum',
-    'pop_millions': 'first'
-}).reset_index()
-
-# Derive target: recommended centers
-state_agg['recommended_centers'] = (state_agg['pop_millions'] * 20) + (state_agg['total_updates'] / 100000)
-state_agg['state_enc'] = le.transform(state_agg['state'])
-
-X3 = state_agg[['state_enc', 'pop_millions', 'total_updates']]
-y3 = state_agg['recommended_centers']
-
-model3 = Ridge()
-model3.fit(X3, y3)
-
-joblib.dump(model3, 'models/infra_optimizer.joblib', compress=3)
-
+def train_infra(le, n_jobs, previous):
+    print("🏗️ Training Model 3: Infrastructure Optimizer...")
+    geo_df = load_processed('geographic_data', columns=['state', 'total_enrollments', 'total_updates'])
+    
+    # Target: Optimal centers (derived: 1 center per 50k population + activity weight)
+    df3 = geo_df.copy()
+    df3['pop_millions'] = population_of(df3['state'])
+    df3 = df3.dropna(subset=['pop_millions'])
+    
+    # Features
+    state_agg = df3.groupby('state', observed=True).agg({
+        'total_enrollments': 'sum',
+        'total_updates': 'sum',
+        'pop_millions': 'first'
+    }).reset_index()
+    
+    # Derive target: recommended centers
+    state_agg['recommended_centers'] = (state_agg['pop_millions'] * 20) + (state_agg['total_updates'] / 100000)
+    state_agg['state_enc'] = le.transform(state_agg['state'])
+    
+    X3 = state_agg[['state_enc', 'pop_millions', 'total_updates']]
+    y3 = state_agg['recommended_centers']
+    
+    model3 = Ridge()
+    model3.fit(X3, y3)
+    return model3, {'mode': 'full', 'rows': len(state_agg)}
 
 # --- MODEL 4: Anomaly Spike Warning ---
-print("🚨 Training Model 4: Anomaly Spike Warning...")
-# Target: Probability of a spike (synthetic: z_score > 2)
-df4 = anomaly_df.copy()
-df4['spike_label'] = np.where(df4['enr_z_score'] > 2, 1, 0)
-
-# Features: Update ratios and volumes
-df4['update_ratio'] = (df4['total_enrollments'] + 1) / (df4['total_enrollments'].mean() + 1)
-
-X4 = df4[['enr_z_score', 'demo_z_score', 'total_enrollments']]
-y4 = df4['spike_label']
-
-model4 = RandomForestClassifier(n_estimators=50, random_state=42)
-model4.fit(X4, y4)
-
-joblib.dump(model4, 'models/spike_warning.joblib', compress=3)
+def train_spike(le, n_jobs, previous):
+    print("🚨 Training Model 4: Anomaly Spike Warning...")
+    anomaly_df = load_processed('anomaly_detection_data', columns=['total_enrollments', 'enr_z_score', 'demo_z_score'])
+    
+    # Target: Probability of a spike (synthetic: z_score > 2)
+    df4 = anomaly_df.copy()
+    df4['spike_label'] = np.where(df4['enr_z_score'] > 2, 1, 0)
+    
+    X4 = df4[['enr_z_score', 'demo_z_score', 'total_enrollments']]
+    y4 = df4['spike_label']
+    
+    model4 = RandomForestClassifier(n_estimators=50, random_state=42, n_jobs=n_jobs)
+    model4.fit(X4, y4)
+    return model4, {'mode': 'full', 'rows': len(df4)}
+
+TRAINERS = {
+    'demand': train_demand,
+    'infra': train_infra,
+    'spike': train_spike
+}
 
-print("✅ All Strategic ML Models Trained and Saved in /models/")
+def _train_and_save(name, le, n_jobs, previous, code):
+    """Train one model in a worker process; returns its manifest entry with time and peak memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    model, info = TRAINERS[name](le, n_jobs, previous)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Saved uncompressed so the dashboard can memory-map the forests instead of inflating them
+    return save_artifact(model, name, code=code, seconds=round(seconds, 2), peak_mb=round(peak / 1e6, 1), **info)
+
+def main(force=False, n_workers=None):
+    print("🚀 Starting ML Model Training Pipeline...")
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    manifest = load_manifest()
+    problems = check_artifacts()
+    code = code_hash()
+    
+    def up_to_date(name):
+        return not force and name not in problems and manifest.get(name, {}).get('code') == code
+    
+    artifacts = {}
+    le = joblib.load(os.path.join(MODEL_DIR, ARTIFACTS['state_encoder'])) if up_to_date('state_encoder') else None
+    retrain_dependents = False
+    if le is None:
+        le = fit_encoder()
+        previous_classes = manifest.get('state_encoder', {}).get('classes')
+        retrain_dependents = previous_classes != list(le.classes_)
+        artifacts['state_encoder'] = save_artifact(le, 'state_encoder', code=code, classes=list(le.classes_))
+    
+    # Models depending on the encoder retrain when its classes change
+    to_train = [name for name in TRAINERS
+                if not up_to_date(name) or (retrain_dependents and name in ('demand', 'infra'))]
+    for name in TRAINERS:
+        if name not in to_train:
+            print(f"⏭️ {name}: inputs unchanged, skipped")
+    
+    if to_train:
+        # What the previous run recorded, for warm starts (none when forced)
+        previous = {} if force else {name: {**manifest.get(name, {}),
+                                            'classes': manifest.get('state_encoder', {}).get('classes')}
+                                     for name in to_train}
+        n_workers = min(n_workers or os.cpu_count() or 1, len(to_train))
+        # Each forest uses its share of the cores
+        n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
+        if n_workers > 1:
+            # Independent models train concurrently, in processes so peak memory is per model
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = {name: executor.submit(_train_and_save, name, le, n_jobs, previous.get(name, {}), code)
+                           for name in to_train}
+                for name, future in futures.items():
+                    artifacts[name] = future.result()
+        else:
+            for name in to_train:
+                artifacts[name] = _train_and_save(name, le, n_jobs, previous.get(name, {}), code)
+    
+    write_manifest(artifacts)
+    
+    if to_train:
+        print("")
+        print(f"{'Model':<10} {'Mode':<11} {'Rows':>8} {'Seconds':>8} {'Peak MB':>8}")
+        with open(TRAINING_LOG, 'a', encoding='utf-8') as log:
+            for name in to_train:
+                entry = artifacts[name]
+                print(f"{name:<10} {entry['mode']:<11} {entry['rows']:>8} {entry['seconds']:>8.2f} {entry['peak_mb']:>8.1f}")
+                log.write(json.dumps({'model': name, **{k: entry[k] for k in ('saved_at', 'mode', 'rows', 'seconds', 'peak_mb')}}) + "\n")
+    
+    print("✅ All Strategic ML Models Trained and Saved in /models/")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the dashboard's ML models, skipping up-to-date ones.")
+    parser.add_argument('--force', action='store_true', help="Retrain every model from scratch")
+    parser.add_argument('--workers', type=int, default=None, help="Models trained at once (default: one per core, up to all that need it)")
+    args = parser.parse_args()
+    main(force=args.force, n_workers=args.workers)
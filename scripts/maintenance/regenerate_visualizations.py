@@ -0,0 +1,254 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import seaborn as sns
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath('.'))
+from utils.data_loader import PROCESSED_DIR, load_processed
+from utils.metrics import add_metrics
+
+# Regenerates the polished versions of the analysis charts. Every dataset is loaded once
+# and its derived columns computed once; figures render in worker processes from the
+# small frames they plot, and figures whose inputs are unchanged are skipped.
+sns.set(style="whitegrid")
+
+VIS_DIR = 'visualizations'
+# Input hash of every figure at its last render
+STATE_FILE = os.path.join(VIS_DIR, 'figures_manifest.json')
+
+# Columns each figure's dataset is loaded with
+DATASETS = {
+    'pincode_data': ['state', 'pincode', 'age_0_5', 'age_5_17', 'age_18_greater', 'demo_age_5_17',
+                     'demo_age_17_', 'bio_age_5_17', 'bio_age_17_'],
+    'geographic_data': ['state', 'total_enrollments', 'total_updates'],
+    'anomaly_detection_data': ['state', 'total_enrollments'],
+    'update_behavior_data': ['district', 'update_to_enrollment_ratio']
+}
+
+# Display names of the activity columns in the correlation heatmap
+COLUMN_LABELS = {
+    'age_0_5': 'Children (0-5)',
+    'age_5_17': 'Youth (5-17)',
+    'age_18_greater': 'Adults (18+)',
+    'demo_age_5_17': 'Demographic Update (Youth)',
+    'demo_age_17_': 'Demographic Update (Adult)',
+    'bio_age_5_17': 'Biometric Update (Youth)',
+    'bio_age_17_': 'Biometric Update (Adult)'
+}
+
+def derive(name, df):
+    """Add the derived columns shared by the figures drawing on dataset `name`."""
+    if name == 'pincode_data':
+        add_metrics(df, ['update_type_index', 'total_updates'])
+    return df
+
+# --- Figure data: computed in the main process, vectorized over the shared frame ---
+
+def correlation_data(df):
+    return df[list(COLUMN_LABELS)].rename(columns=COLUMN_LABELS).corr()
+
+def update_index_data(df):
+    return df.groupby('state', observed=True)['update_type_index'].mean().sort_values()
+
+def bubble_data(df):
+    state_pivot = df.groupby('state', observed=True).agg(
+        age_0_5=('age_0_5', 'sum'),
+        total_updates=('total_updates', 'sum'),
+        num_pincodes=('pincode', 'count')
+    )
+    state_pivot['total_activity'] = state_pivot['age_0_5'] + state_pivot['total_updates']
+    return state_pivot
+
+def top_states_data(df):
+    return df.groupby('state', observed=True)['total_enrollments'].sum().nlargest(10)
+
+def enrollment_updates_data(df):
+    return df[['total_enrollments', 'total_updates']]
+
+def enrollment_outliers_data(df):
+    # Only the top 15 states by volume, to avoid overcrowding
+    top_states = df.groupby('state', observed=True)['total_enrollments'].sum().nlargest(15).index
+    filtered = df[df['state'].isin(top_states)].copy()
+    filtered['state'] = filtered['state'].cat.remove_unused_categories()
+    return filtered
+
+def update_intensity_data(df):
+    return df.groupby('district', observed=True)['update_to_enrollment_ratio'].mean().nlargest(15)
+
+# --- Renderers: run in the workers, plotting only what their data function returned ---
+
+def _save(path):
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+def render_correlation(corr_matrix, path):
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt='.2f', linewidths=0.5,
+                square=True, cbar_kws={"shrink": 0.8})
+    plt.title('Correlation Matrix: Aadhaar Service Activities', fontsize=16, fontweight='bold', pad=20)
+    plt.xticks(rotation=45, ha='right', fontsize=10)
+    plt.yticks(rotation=0, fontsize=10)
+    _save(path)
+
+def render_update_index(state_index, path):
+    plt.figure(figsize=(10, 12))
+    state_index.plot(kind='barh', color='teal')
+    plt.axvline(1, color='red', linestyle='--', label='Balanced Ratio', linewidth=2)
+    plt.title('Demographic-to-Biometric Update Index by State', fontsize=14, fontweight='bold')
+    plt.xlabel('Ratio (Demographic / Biometric)', fontsize=12)
+    plt.ylabel('State', fontsize=12)
+    plt.yticks(fontsize=9)
+    plt.legend(fontsize=11)
+    _save(path)
+
+def render_bubble(state_pivot, path):
+    plt.figure(figsize=(16, 10))
+    sns.scatterplot(data=state_pivot, x='age_0_5', y='total_updates',
+                    size='num_pincodes', hue='num_pincodes', palette='viridis',
+                    sizes=(200, 2000), alpha=0.7, edgecolor='black', linewidth=0.5)
+    
+    # Only the top 10 states by total activity are labelled, for readability
+    top = state_pivot.nlargest(10, 'total_activity')
+    for state, x, y in zip(top.index, top['age_0_5'], top['total_updates']):
+        plt.annotate(state, (x, y), fontsize=11, fontweight='bold', alpha=0.9,
+                     bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.7, edgecolor='gray'))
+    
+    plt.title('Market Maturity: New Child Enrollments vs. System Updates by State', fontsize=16, fontweight='bold')
+    plt.xlabel('Child Enrollments (0-5 Years)', fontsize=13)
+    plt.ylabel('Total Citizen Updates', fontsize=13)
+    plt.legend(title='Number of Pincodes', fontsize=10, title_fontsize=11)
+    _save(path)
+
+def render_top_states(state_data, path):
+    plt.figure(figsize=(12, 6))
+    state_data.plot(kind='bar', color='skyblue')
+    plt.title('Top 10 States by Total Enrollments', fontsize=14, fontweight='bold')
+    plt.ylabel('Enrollments', fontsize=12)
+    plt.xlabel('State', fontsize=12)
+    plt.xticks(rotation=45, ha='right')
+    _save(path)
+
+def render_enrollment_updates(data, path):
+    plt.figure(figsize=(12, 6))
+    sns.scatterplot(data=data, x='total_enrollments', y='total_updates', alpha=0.5)
+    plt.title('Enrollments vs Total Updates by Pincode', fontsize=14, fontweight='bold')
+    plt.xlabel('Total Enrollments', fontsize=12)
+    plt.ylabel('Total Updates', fontsize=12)
+    _save(path)
+
+def render_enrollment_outliers(filtered, path):
+    plt.figure(figsize=(16, 8))
+    sns.boxplot(x='state', y='total_enrollments', data=filtered)
+    plt.xticks(rotation=45, ha='right', fontsize=10)
+    plt.title('Distribution of Enrollments by State (Top 15 States)', fontsize=14, fontweight='bold')
+    plt.xlabel('State', fontsize=12)
+    plt.ylabel('Total Enrollments', fontsize=12)
+    _save(path)
+
+def render_update_intensity(top_districts, path):
+    plt.figure(figsize=(14, 10))
+    names = top_districts.index.astype(str)
+    sns.barplot(x=top_districts.values, y=names, hue=names, palette='magma', legend=False)
+    plt.title('Top 15 Districts by Update Intensity (Updates per Enrollment)', fontsize=14, fontweight='bold')
+    plt.xlabel('Update Ratio', fontsize=12)
+    plt.ylabel('District', fontsize=10)
+    plt.yticks(fontsize=9)
+    _save(path)
+
+# file name: (dataset, data function, renderer)
+FIGURES = {
+    '07_metric_correlation_heatmap.png': ('pincode_data', correlation_data, render_correlation),
+    '07_demo_vs_bio_index_by_state.png': ('pincode_data', update_index_data, render_update_index),
+    '07_growth_saturation_bubble_plot.png': ('pincode_data', bubble_data, render_bubble),
+    '01_top_10_states_enrollment.png': ('geographic_data', top_states_data, render_top_states),
+    '01_enrollments_vs_updates_correlation.png': ('geographic_data', enrollment_updates_data, render_enrollment_updates),
+    '04_enrollment_outliers_by_state.png': ('anomaly_detection_data', enrollment_outliers_data, render_enrollment_outliers),
+    '03_top_update_intensity_districts.png': ('update_behavior_data', update_intensity_data, render_update_intensity)
+}
+
+def _table_path(name):
+    parquet_path = os.path.join(PROCESSED_DIR, f"{name}.parquet")
+    if os.path.exists(parquet_path):
+        return parquet_path
+    return os.path.join(PROCESSED_DIR, f"{name}.csv")
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    if not os.path.exists(path):
+        return '<missing>'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def figure_hashes():
+    """Input hash of every figure: its dataset's content plus this script and the metric formulas."""
+    code = _file_hash(os.path.abspath(__file__)) + _file_hash(os.path.join('utils', 'metrics.py'))
+    tables = {name: _file_hash(_table_path(name)) for name in DATASETS}
+    return {figure: hashlib.sha256(f"{code}:{tables[dataset]}".encode('utf-8')).hexdigest()
+            for figure, (dataset, _, _) in FIGURES.items()}
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state):
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+def _render(figure, data):
+    start = time.perf_counter()
+    FIGURES[figure][2](data, os.path.join(VIS_DIR, figure))
+    return time.perf_counter() - start
+
+def main(force=False, n_workers=None):
+    os.makedirs(VIS_DIR, exist_ok=True)
+    state = load_state()
+    hashes = figure_hashes()
+    # A figure is current only if its inputs are unchanged and the PNG on disk is still the one
+    # rendered here: the analysis notebooks write their own drafts under the same file names
+    stale = [figure for figure in FIGURES
+             if force or state.get(figure) != {'inputs': hashes[figure],
+                                               'output': _file_hash(os.path.join(VIS_DIR, figure))}]
+    for figure in FIGURES:
+        if figure not in stale:
+            print(f"⏭️ {figure}: inputs unchanged, skipped")
+    if not stale:
+        return
+    
+    # Each dataset a stale figure needs is loaded and derived once
+    frames = {}
+    for dataset in dict.fromkeys(FIGURES[figure][0] for figure in stale):
+        frames[dataset] = derive(dataset, load_processed(dataset, columns=DATASETS[dataset]))
+    data = {figure: FIGURES[figure][1](frames[FIGURES[figure][0]]) for figure in stale}
+    frames.clear()
+    
+    n_workers = min(n_workers or os.cpu_count() or 1, len(stale))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = {figure: executor.submit(_render, figure, data[figure]) for figure in stale}
+            seconds = {figure: future.result() for figure, future in futures.items()}
+    else:
+        seconds = {figure: _render(figure, data[figure]) for figure in stale}
+    
+    for figure in stale:
+        state[figure] = {'inputs': hashes[figure], 'output': _file_hash(os.path.join(VIS_DIR, figure))}
+        print(f"✅ {figure} ({seconds[figure]:.1f}s)")
+    save_state(state)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the polished visualizations, skipping unchanged ones.")
+    parser.add_argument('--force', action='store_true', help="Render every figure even if its inputs are unchanged")
+    parser.add_argument('--workers', type=int, default=None, help="Figures rendered at once (default: all cores)")
+    args = parser.parse_args()
+    main(force=args.force, n_workers=args.workers)
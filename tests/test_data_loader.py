@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from utils.data_loader import MASTER_NAME, RAW_DIRS, build_master_data, load_processed
+
+# Two raw datasets; the biometric one has no shard directory at all
+SHARDS = {
+    'enrolment': pd.DataFrame({
+        'date': ['01-03-2025', '01-03-2025', '02-03-2025'],
+        'state': ['Delhi', 'Goa', 'Delhi'],
+        'district': ['New Delhi', 'North Goa', 'New Delhi'],
+        'pincode': ['110001', '403001', '110001'],
+        'age_0_5': [1, 2, 3], 'age_5_17': [0, 1, 0], 'age_18_greater': [4, 0, 1]
+    }),
+    'demographic': pd.DataFrame({
+        'date': ['01-03-2025', '03-03-2025'],
+        'state': ['Delhi', 'Kerala'],
+        'district': ['New Delhi', 'Ernakulam'],
+        'pincode': ['110001', '682001'],
+        'demo_age_5_17': [5, 6], 'demo_age_17_': [7, 8]
+    })
+}
+
+@pytest.fixture
+def raw_root(tmp_path):
+    for dataset, shard in SHARDS.items():
+        directory = tmp_path / RAW_DIRS[dataset]
+        directory.mkdir()
+        shard.to_csv(directory / f"{RAW_DIRS[dataset]}_0.csv", index=False)
+    return tmp_path
+
+@pytest.mark.parametrize('chunksize', [None, 2])
+def test_dataset_without_shards_merges_as_zeros(raw_root, chunksize):
+    build_master_data(str(raw_root), n_workers=1, chunksize=chunksize)
+    master = load_processed(MASTER_NAME, base_path=str(raw_root)).astype({'state': str, 'district': str})
+    master = master.set_index(['state', 'district', 'pincode']).sort_index()
+    
+    assert list(master.index) == [('Delhi', 'New Delhi', 110001), ('Goa', 'North Goa', 403001),
+                                  ('Kerala', 'Ernakulam', 682001)]
+    assert (master[['bio_age_5_17', 'bio_age_17_']] == 0).all().all()
+    assert master['age_0_5'].tolist() == [4, 2, 0]
+    assert master['demo_age_17_'].tolist() == [7, 0, 8]
@@ -0,0 +1,75 @@
+import pandas as pd
+import numpy as np
+
+# Peer group each row is scored against; 'pincode' scores the rows of the daily or monthly
+# rollup against that pincode's own history
+GRAINS = {
+    'state': ['state'],
+    'district': ['state', 'district'],
+    'pincode': ['state', 'district', 'pincode']
+}
+
+# Headline totals keep their short names in the output (enr_z_score, is_enr_anomaly, ...)
+METRIC_NAMES = {
+    'total_enrollments': 'enr',
+    'total_demo_updates': 'demo',
+    'total_bio_updates': 'bio'
+}
+
+DEFAULT_METRICS = ['total_enrollments', 'total_demo_updates', 'total_bio_updates',
+                   'age_0_5', 'age_5_17', 'age_18_greater',
+                   'demo_age_5_17', 'demo_age_17_', 'bio_age_5_17', 'bio_age_17_']
+
+DEFAULT_THRESHOLD = 3.0
+
+# Makes the median absolute deviation comparable to a standard deviation (normal data)
+MAD_SCALE = 0.6745
+
+def metric_name(col):
+    return METRIC_NAMES.get(col, col.rstrip('_'))
+
+def group_scores(df, metrics=None, grain='state', method='zscore'):
+    """Score every metric of every row against its peer group, all metrics in one pass.
+    
+    `method='zscore'` uses the group mean and sample std; `method='mad'` the robust
+    modified z-score 0.6745 * (x - median) / MAD. Rows in groups with a single member or
+    no spread score 0. Returns a float frame aligned with df, one column per metric.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}', expected one of {list(GRAINS)}")
+    metrics = metrics or [col for col in DEFAULT_METRICS if col in df.columns]
+    values = df[metrics].astype('float64')
+    keys = [df[col] for col in GRAINS[grain]]
+    
+    grouped = values.groupby(keys, observed=True)
+    if method == 'zscore':
+        center = grouped.transform('mean')
+        spread = grouped.transform('std')
+        scale = 1.0
+    elif method == 'mad':
+        center = grouped.transform('median')
+        spread = (values - center).abs().groupby(keys, observed=True).transform('median')
+        scale = MAD_SCALE
+    else:
+        raise ValueError(f"Unknown method '{method}', expected 'zscore' or 'mad'")
+    
+    scores = scale * (values - center) / spread
+    # std is NaN for single-row groups and 0 when every value is equal
+    return scores.where(spread > 0, 0.0)
+
+def flag_anomalies(df, metrics=None, grain='state', method='zscore', threshold=DEFAULT_THRESHOLD,
+                   thresholds=None):
+    """Return df with `<name>_z_score` and `is_<name>_anomaly` columns for every metric.
+    
+    A row is flagged when |score| exceeds `threshold`, or the per-metric cutoff given in
+    `thresholds` ({metric column: cutoff}).
+    """
+    scores = group_scores(df, metrics, grain, method)
+    names = [metric_name(col) for col in scores.columns]
+    thresholds = thresholds or {}
+    cutoffs = np.array([thresholds.get(col, threshold) for col in scores.columns])
+    
+    score_df = pd.DataFrame(scores.to_numpy(), index=df.index, columns=[f"{n}_z_score" for n in names])
+    flag_df = pd.DataFrame(np.abs(scores.to_numpy()) > cutoffs, index=df.index,
+                           columns=[f"is_{n}_anomaly" for n in names])
+    return pd.concat([df, score_df, flag_df], axis=1)
@@ -1,47 +1,40 @@
+import argparse
 import os
-import subprocess
 import sys
 
-def run_all_analysis():
+sys.path.append(os.path.abspath('.'))
+from utils.run_notebook import run_notebooks
+
+def run_all_analysis(figures=False, n_workers=None):
+    """Regenerate analysis_results/*_summary.txt for every analysis notebook.
+    
+    The pipeline already writes each summary while running the notebook, so this is only
+    needed to refresh summaries on their own; figures are skipped unless `figures` is set.
+    """
     analysis_dir = "notebooks/analysis"
     results_dir = "analysis_results"
     
     if not os.path.exists(results_dir):
         os.makedirs(results_dir)
-        
+    
     notebooks = sorted([f for f in os.listdir(analysis_dir) if f.endswith(".ipynb")])
+    print(f"Generating summaries for {len(notebooks)} notebooks...")
     
-    python_exe = sys.executable
+    # One set of warm workers runs every notebook; each writes its own summary
+    results = run_notebooks([os.path.join(analysis_dir, nb) for nb in notebooks],
+                            n_workers=n_workers, summary_dir=results_dir, figures=figures)
     
-    for nb in notebooks:
-        nb_path = os.path.join(analysis_dir, nb)
-        output_name = nb.replace(".ipynb", "_summary.txt")
-        output_path = os.path.join(results_dir, output_name)
-        
-        print(f"Generating summary for {nb}...")
-        
-        # We use our run_notebook.py to execute and capture stdout
-        try:
-            result = subprocess.run(
-                [python_exe, "utils/run_notebook.py", nb_path],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(f"=== {nb} Analytical Insights ===\n\n")
-                f.write(result.stdout)
-                
+    for nb_path, success in sorted(results.items()):
+        output_path = os.path.join(results_dir, os.path.basename(nb_path).replace(".ipynb", "_summary.txt"))
+        if success:
             print(f"Successfully saved to {output_path}")
-            
-        except subprocess.CalledProcessError as e:
-            print(f"Error running {nb}: {e.stderr}")
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(f"=== {nb} Run Error ===\n\n")
-                f.write(e.stdout)
-                f.write("\nERROR:\n")
-                f.write(e.stderr)
+        else:
+            print(f"Error running {os.path.basename(nb_path)}, details saved to {output_path}")
 
 if __name__ == "__main__":
-    run_all_analysis()
+    parser = argparse.ArgumentParser(description="Regenerate the analysis notebook summaries.")
+    parser.add_argument('--figures', action='store_true', help="Also re-render and save the figures")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Warm worker processes (default: all cores)")
+    args = parser.parse_args()
+    run_all_analysis(figures=args.figures, n_workers=args.workers)
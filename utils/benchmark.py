@@ -0,0 +1,341 @@
+import pandas as pd
+import numpy as np
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from utils import dashboard_data
+from utils.cube import build_cube
+from utils.data_loader import (DAILY_KEYS, DATE_FORMAT, KEY_COLS, RAW_DIRS, get_dtype_map, load_csv_files, merge_all_datasets,
+                               stream_merge_all_datasets)
+from utils.downsample import downsample, linear_fit
+from utils.geo import load_geojson
+from utils.incremental import invalidate_table, refresh_master_data
+from utils.inference import MANIFEST_FILE, MODEL_DIR, InferenceService
+from utils.pipeline import PREPROCESSING, ROOT
+from utils.population import POPULATION_FILE, load_population
+from utils.run_notebook import run_notebook
+
+# Times every stage of the project on synthetic raw shards shaped like the api_data_aadhar_*
+# extracts, at several multiples of the current data size, and saves the timings and peak
+# memory as JSON so a pandas upgrade or a pipeline change can be compared against a baseline.
+BENCH_DIR = 'benchmarks'
+
+# Raw rows per dataset at 1x: the current extracts (5M+ records across the three), about
+# 0.2 GB of CSV. The default run writes about 2.3 GB; --scales 100 adds about 21 GB
+BASE_ROWS = {
+    'enrolment': 1_000_000,
+    'demographic': 2_000_000,
+    'biometric': 2_000_000
+}
+DEFAULT_SCALES = [1, 10]
+
+# Rows per generated shard, as in the published extracts
+SHARD_ROWS = 500_000
+
+# Raw rows (all datasets) up to which ingestion is also timed in memory; loading every shard
+# takes about 0.25 GB of RAM per million rows, so larger scales are only streamed, in chunks
+# of STREAM_CHUNKSIZE rows
+IN_MEMORY_ROWS = 20_000_000
+STREAM_CHUNKSIZE = SHARD_ROWS
+
+# Mean of every count column (Poisson); most pincode-days see a handful of requests
+COUNT_MEANS = {
+    'age_0_5': 3.0, 'age_5_17': 1.5, 'age_18_greater': 0.5,
+    'demo_age_5_17': 2.0, 'demo_age_17_': 12.0,
+    'bio_age_5_17': 8.0, 'bio_age_17_': 10.0
+}
+DATES = pd.date_range('2025-03-01', '2025-12-31')
+
+# Rows scored by each batched prediction case, and calls made by the single-row case
+PREDICT_ROWS = 10_000
+PREDICT_ONE_CALLS = 1_000
+
+# Baseline comparisons flag cases this much slower, unless both runs took under
+# MIN_FLAGGED_SECONDS (timer noise)
+REGRESSION_RATIO = 1.2
+MIN_FLAGGED_SECONDS = 0.05
+
+def _geography(seed=0):
+    """(state, district, pincode) triples of the real extracts, or made-up ones without them."""
+    files = glob.glob(os.path.join(ROOT, 'api_data_aadhar_*', '*.csv'))
+    if files:
+        keys = pd.concat([pd.read_csv(f, usecols=KEY_COLS, dtype=str) for f in files], ignore_index=True)
+        return keys.dropna().drop_duplicates(ignore_index=True)
+    rng = np.random.default_rng(seed)
+    rows = [(state, f"{state} District {d + 1}", str(pincode))
+            for state in load_population(ROOT).index
+            for d in range(20)
+            for pincode in rng.choice(np.arange(110000, 860000), 30, replace=False)]
+    return pd.DataFrame(rows, columns=KEY_COLS)
+
+def generate_shards(root, multiple, seed=0):
+    """Write `multiple` x BASE_ROWS synthetic rows per dataset under root, in SHARD_ROWS shards.
+    
+    Shards matching a previous run (same row counts and seed) are reused. Returns the row counts.
+    """
+    rows = {dataset: max(1, int(BASE_ROWS[dataset] * multiple)) for dataset in RAW_DIRS}
+    spec_path = os.path.join(root, 'synthetic.json')
+    spec = {'rows': rows, 'seed': seed}
+    if os.path.exists(spec_path):
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == spec:
+                return rows
+    
+    geography = _geography(seed)
+    dates = DATES.strftime(DATE_FORMAT).to_numpy()
+    rng = np.random.default_rng(seed)
+    for dataset, raw_dir in RAW_DIRS.items():
+        directory = os.path.join(root, raw_dir)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        counts = [col for col, dtype in get_dtype_map(dataset).items() if dtype == 'int32']
+        for start in range(0, rows[dataset], SHARD_ROWS):
+            n = min(SHARD_ROWS, rows[dataset] - start)
+            shard = geography.iloc[rng.integers(0, len(geography), n)].reset_index(drop=True)
+            shard.insert(0, 'date', dates[rng.integers(0, len(dates), n)])
+            for col in counts:
+                shard[col] = rng.poisson(COUNT_MEANS[col], n)
+            shard.to_csv(os.path.join(directory, f"{raw_dir}_{start}_{start + n}.csv"), index=False)
+    
+    with open(spec_path, 'w', encoding='utf-8') as f:
+        json.dump(spec, f, indent=2)
+    return rows
+
+def measure(fn, setup=None, repeat=1, memory=True):
+    """Run fn (after setup) `repeat` times; returns its result, the best time and peak memory.
+    
+    Peak memory is what tracemalloc sees during one further run (Python and NumPy
+    allocations; Arrow's own buffers are not traced). Output is silenced.
+    """
+    seconds = []
+    result = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            result = fn()
+            seconds.append(time.perf_counter() - start)
+        peak = None
+        if memory:
+            if setup:
+                setup()
+            tracemalloc.start()
+            try:
+                fn()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return result, {'seconds': round(min(seconds), 4), 'peak_mb': None if peak is None else round(peak / 1e6, 1)}
+
+def _run_preprocessing(root, notebook):
+    # Notebooks resolve the project root from their own directory, so run a copy inside root
+    path = os.path.join(root, 'notebooks', 'preprocessing', f"{notebook}.ipynb")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copyfile(os.path.join(ROOT, 'notebooks', 'preprocessing', f"{notebook}.ipynb"), path)
+    if not run_notebook(path, figures=False):
+        raise RuntimeError(f"{notebook} failed on the synthetic data")
+
+def _train_models(root):
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')]))}
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'notebooks', 'analysis', '10_ml_training.py'), '--force'],
+                            cwd=root, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"10_ml_training.py failed on the synthetic data:\n{result.stderr[-2000:]}")
+
+def _state_geojson():
+    try:
+        return load_geojson('state', base_path=ROOT)
+    except FileNotFoundError:
+        return None
+
+def _prediction_rows(service, anomaly_df, seed=0):
+    rng = np.random.default_rng(seed)
+    states = rng.choice(service.states, PREDICT_ROWS)
+    return {
+        'demand': pd.DataFrame({'state': states, 'pop_millions': rng.uniform(0.5, 250, PREDICT_ROWS),
+                                'year': rng.choice(dashboard_data.FORECAST_YEARS, PREDICT_ROWS),
+                                'total_enrollments': rng.integers(0, 5_000_000, PREDICT_ROWS)}),
+        'infra': pd.DataFrame({'state': states, 'pop_millions': rng.uniform(0.5, 250, PREDICT_ROWS),
+                               'total_updates': rng.integers(0, 50_000_000, PREDICT_ROWS)}),
+        'spike': anomaly_df[['enr_z_score', 'demo_z_score', 'total_enrollments']]
+                 .sample(PREDICT_ROWS, replace=True, random_state=seed).reset_index(drop=True)
+    }
+
+def run_scale(root, workers=None, repeat=1, memory=True, in_memory=True, log=print):
+    """Benchmark every stage on the raw shards under root; returns {case: {seconds, peak_mb}}.
+    
+    With in_memory False the raw shards are only ever streamed (see IN_MEMORY_ROWS).
+    """
+    cases = {}
+    def case(name, fn, setup=None, traced=memory):
+        result, cases[name] = measure(fn, setup, repeat, traced)
+        peak = cases[name]['peak_mb']
+        log(f"{name:<50} {cases[name]['seconds']:>10.3f} {'-' if peak is None else f'{peak:.1f}':>10}")
+        return result
+
+    # The cube and model training join the reference population from the project root
+    os.makedirs(os.path.join(root, os.path.dirname(POPULATION_FILE)), exist_ok=True)
+    shutil.copyfile(os.path.join(ROOT, POPULATION_FILE), os.path.join(root, POPULATION_FILE))
+    
+    # Ingestion
+    if in_memory:
+        frames = {dataset: case(f"ingest/load_csv_files/{dataset}",
+                                lambda d=dataset: load_csv_files(os.path.join(root, RAW_DIRS[d], '*.csv'), d, workers,
+                                                                 base_path=root))
+                  for dataset in RAW_DIRS}
+        case("ingest/merge_all_datasets",
+             lambda: merge_all_datasets(frames['enrolment'], frames['demographic'], frames['biometric'], DAILY_KEYS))
+        frames.clear()
+    case("ingest/stream_merge_all_datasets", lambda: stream_merge_all_datasets(root, STREAM_CHUNKSIZE, DAILY_KEYS))
+    case("ingest/refresh_master_data",
+         lambda: refresh_master_data(root, workers, full=True, chunksize=None if in_memory else STREAM_CHUNKSIZE))
+    
+    # Every derivation in full, as after a change to its code
+    for notebook, table in PREPROCESSING:
+        case(f"preprocessing/{notebook}", lambda n=notebook: _run_preprocessing(root, n),
+             setup=lambda t=table: invalidate_table(t, root))
+    case("cube/build_cube", lambda: build_cube(root))
+    
+    # Dashboard pages, from cold loads to the frames each page charts
+    tables = case("dashboard/load_tables", lambda: dashboard_data.load_tables(root))
+    cube = case("dashboard/load_cube_tables", lambda: dashboard_data.load_cube_tables(root))
+    index = case("dashboard/load_pincode_index", lambda: dashboard_data.load_pincode_index(root))
+    drill_state = index.states()[0]
+    drill_district = index.districts(drill_state)[0]
+    geo_df, age_df, update_df, anomaly_df, predictive_df, pincode_df = tables
+    pages = {
+        'overview': lambda: dashboard_data.overview(cube),
+        'geographic_analysis': lambda: (dashboard_data.top_districts(cube),
+                                        downsample(geo_df, 'total_enrollments', 'total_updates'),
+                                        linear_fit(geo_df['total_enrollments'], geo_df['total_updates'])),
+        'age_demographics': lambda: dashboard_data.age_profile(age_df),
+        'update_behavior': lambda: dashboard_data.update_intensity(cube),
+        'anomaly_detection': lambda: (dashboard_data.anomaly_outliers(cube, anomaly_df),
+                                      downsample(anomaly_df, 'enr_z_score', 'demo_z_score',
+                                                 keep=['is_enr_anomaly', 'is_demo_anomaly'])),
+        'predictive_analytics': lambda: (downsample(predictive_df, 'total_enrollments', 'total_updates'),
+                                         linear_fit(predictive_df['total_enrollments'], predictive_df['total_updates']),
+                                         [dashboard_data.service_gaps(grain, root) for grain in dashboard_data.GAP_LABELS]),
+        'pincode_analysis': lambda: (dashboard_data.activity_histogram(pincode_df),
+                                     dashboard_data.catchment(index.state(drill_state)),
+                                     dashboard_data.catchment(index.district(drill_state, drill_district)),
+                                     dashboard_data.catchment(index.search('11'))),
+        'advanced_insights': lambda: dashboard_data.relationships(pincode_df),
+        'geographic_heatmaps': lambda: (_state_geojson(), cube['geo_state']),
+        'population_penetration': lambda: dashboard_data.penetration(cube)
+    }
+    for page, fn in pages.items():
+        case(f"dashboard/{page}", fn)
+    
+    # Models: training runs in its own process and records its per-model peak memory itself
+    case("ml/10_ml_training", lambda: _train_models(root), traced=False)
+    model_dir = os.path.join(root, MODEL_DIR)
+    with open(os.path.join(model_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        peaks = [entry['peak_mb'] for entry in json.load(f).values() if 'peak_mb' in entry]
+    cases["ml/10_ml_training"]['peak_mb'] = max(peaks, default=None)
+    
+    case("inference/preload", lambda: InferenceService(model_dir).preload())
+    service = InferenceService(model_dir)
+    service.preload()
+    case("dashboard/ml_insights", lambda: dashboard_data.demand_projection(cube, service))
+    for name, rows in _prediction_rows(service, anomaly_df).items():
+        case(f"inference/predict/{name}", lambda n=name, r=rows: service.predict(n, r))
+    
+    # Distinct inputs on a fresh service, so every call misses the cache
+    fresh = {}
+    def fresh_service():
+        fresh['service'] = InferenceService(model_dir)
+        fresh['service'].preload()
+    calls = _prediction_rows(service, anomaly_df, seed=1)['spike'].head(PREDICT_ONE_CALLS).to_dict('records')
+    case("inference/predict_one", lambda: [fresh['service'].predict_one('spike', **row) for row in calls],
+         setup=fresh_service)
+    case("inference/predict_one_cached", lambda: [service.predict_one('spike', **row) for row in calls],
+         setup=lambda: [service.predict_one('spike', **row) for row in calls])
+    return cases
+
+def environment():
+    import pyarrow
+    import sklearn
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': pyarrow.__version__,
+        'scikit-learn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def run_benchmarks(scales=DEFAULT_SCALES, base_scale=1.0, workers=None, repeat=1, memory=True, seed=0):
+    """Generate (or reuse) the shards of every scale and benchmark them in turn."""
+    results = {'created': datetime.now().isoformat(timespec='seconds'), 'environment': environment(),
+               'base_scale': base_scale, 'repeat': repeat, 'scales': {}}
+    for scale in scales:
+        root = os.path.abspath(os.path.join(BENCH_DIR, 'data', f"{scale}x"))
+        print(f"\n=== {scale}x ===")
+        start = time.perf_counter()
+        rows = generate_shards(root, scale * base_scale, seed)
+        in_memory = sum(rows.values()) <= IN_MEMORY_ROWS
+        print(f"Shards: {rows} ({time.perf_counter() - start:.1f}s)" + ('' if in_memory else ', streamed only'))
+        print(f"{'Case':<50} {'Seconds':>10} {'Peak MB':>10}")
+        results['scales'][f"{scale}x"] = {'rows': rows, 'cases': run_scale(root, workers, repeat, memory, in_memory)}
+    return results
+
+def compare(results, baseline):
+    """Print every case's time against a baseline run; returns the cases REGRESSION_RATIO slower."""
+    regressions = []
+    print(f"\n{'Case':<56} {'Baseline':>10} {'Now':>10} {'Ratio':>7}")
+    for scale, current in results['scales'].items():
+        previous = baseline['scales'].get(scale, {}).get('cases', {})
+        for name, stats in current['cases'].items():
+            if name not in previous or not previous[name]['seconds']:
+                continue
+            ratio = stats['seconds'] / previous[name]['seconds']
+            slow = ratio >= REGRESSION_RATIO and stats['seconds'] >= MIN_FLAGGED_SECONDS
+            flag = ' ⚠️' if slow else ''
+            if flag:
+                regressions.append(f"{scale} {name}")
+            print(f"{scale + ' ' + name:<56} {previous[name]['seconds']:>10.3f} {stats['seconds']:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, preprocessing, dashboard pages and inference on synthetic data.")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="Multiples of the current data size to run (default: 1 10; 100 needs about 21 GB of disk)")
+    parser.add_argument('--base-scale', type=float, default=1.0,
+                        help="Fraction of the current data size that counts as 1x (e.g. 0.01 for a quick run)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Shards parsed concurrently during ingestion (default: all cores)")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per case; the fastest is reported")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced run measuring peak memory")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic data")
+    parser.add_argument('--output', default=None,
+                        help="Results file (default: benchmarks/benchmark_<timestamp>.json)")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to compare the timings against")
+    args = parser.parse_args()
+    
+    results = run_benchmarks(args.scales, args.base_scale, args.workers, args.repeat, not args.no_memory, args.seed)
+    output = args.output or os.path.join(BENCH_DIR, f"benchmark_{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            print(f"{len(regressions)} case(s) at least {REGRESSION_RATIO}x slower than the baseline")
+            sys.exit(1)
@@ -0,0 +1,129 @@
+import pandas as pd
+import argparse
+import hashlib
+import json
+import os
+
+from utils.data_loader import KEY_COLS, PROCESSED_DIR, load_processed
+from utils.population import POPULATION_FILE, add_penetration
+
+# Pre-aggregated rollups of the processed tables, read by the dashboard instead of
+# grouping the pincode-level rows on every rerun
+CUBE_DIR = os.path.join(PROCESSED_DIR, 'cube')
+CUBE_MANIFEST = 'cube_manifest.json'
+
+CUBE_TABLES = ['geographic_data', 'age_demographics_data', 'update_behavior_data',
+               'anomaly_detection_data', 'predictive_data', 'pincode_data']
+
+# Group keys of each rollup; states are grouped by their normalised name (see clean_state)
+GRAINS = {
+    'state': ['state_clean'],
+    'district': ['state_clean', 'district'],
+    'pincode': ['state_clean', 'district', 'pincode']
+}
+
+# Rows behind each group, so a mean is <column> / n_rows
+COUNT_COL = 'n_rows'
+
+# Numeric columns no rollup sums or stores: per-row anomaly scores, whose sums mean nothing
+# (the is_*_anomaly flags are summed into counts instead). The keys finer than a grain, such
+# as the int32 pincode in the state and district rollups, are left out as well
+NON_ADDITIVE_SUFFIXES = ('_z_score',)
+
+def clean_state(state):
+    if pd.isna(state):
+        return None
+    s = str(state).strip()
+    s = s.replace(' & ', ' and ')
+    if s == 'Orissa':
+        return 'Odisha'
+    if s in ['Dadra and Nagar Haveli', 'Daman and Diu']:
+        return 'Dadra and Nagar Haveli and Daman and Diu'
+    return s
+
+def normalize_states(df):
+    """Add `state_clean` and drop the rows without a state.
+    
+    clean_state runs once per distinct state rather than once per row.
+    """
+    states = df['state'].astype('category')
+    mapping = {state: clean_state(state) for state in states.cat.categories}
+    df['state_clean'] = states.map(mapping).astype('category')
+    return df[df['state_clean'].notna()]
+
+def _source_path(name, base_path='.'):
+    parquet_path = os.path.join(base_path, PROCESSED_DIR, f"{name}.parquet")
+    if os.path.exists(parquet_path):
+        return parquet_path
+    return os.path.join(base_path, PROCESSED_DIR, f"{name}.csv")
+
+def data_version(base_path='.'):
+    """Fingerprint of the source tables, the population reference and this module (which
+    decides what the rollups hold) from their file stats, cheap enough for every rerun."""
+    digest = hashlib.sha256()
+    paths = ([_source_path(name, base_path) for name in CUBE_TABLES] +
+             [os.path.join(base_path, POPULATION_FILE), os.path.abspath(__file__)])
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()
+
+def rollup(df, grain):
+    """Sum every numeric column per grain (flags become counts), with the group size in n_rows."""
+    keys = GRAINS[grain]
+    values = [col for col in df.select_dtypes(include=['number', 'bool']).columns
+              if col not in keys and col not in KEY_COLS and not col.endswith(NON_ADDITIVE_SUFFIXES)]
+    grouped = df.groupby(keys, observed=True)
+    result = grouped[list(values)].sum()
+    result[COUNT_COL] = grouped.size()
+    return result.reset_index()
+
+def _cube_path(name, grain, base_path='.'):
+    return os.path.join(base_path, CUBE_DIR, f"{name}.{grain}.parquet")
+
+def build_cube(base_path='.'):
+    """Write every rollup of every processed table and record the data version they match."""
+    version = data_version(base_path)
+    os.makedirs(os.path.join(base_path, CUBE_DIR), exist_ok=True)
+    
+    for name in CUBE_TABLES:
+        if not os.path.exists(_source_path(name, base_path)):
+            continue
+        df = normalize_states(load_processed(name, base_path=base_path))
+        for grain, keys in GRAINS.items():
+            if all(col in df.columns for col in keys):
+                table = rollup(df, grain)
+                if grain == 'state':
+                    # Population and per-capita activity are joined once here, not per render
+                    add_penetration(table, base_path=base_path)
+                table.to_parquet(_cube_path(name, grain, base_path), index=False)
+    
+    with open(os.path.join(base_path, CUBE_DIR, CUBE_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump({'version': version}, f, indent=2)
+    print(f"Cube built for {len(CUBE_TABLES)} tables ({version[:12]})")
+    return version
+
+def ensure_cube(base_path='.'):
+    """Rebuild the cube if any source table changed since it was built. Returns the data version."""
+    manifest_path = os.path.join(base_path, CUBE_DIR, CUBE_MANIFEST)
+    version = data_version(base_path)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if json.load(f).get('version') == version:
+                return version
+    return build_cube(base_path)
+
+def load_cube(name, grain, columns=None, base_path='.'):
+    """Load one rollup; means are <column> / n_rows."""
+    return pd.read_parquet(_cube_path(name, grain, base_path), columns=columns)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the dashboard's aggregate cube from the processed tables.")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the sources are unchanged")
+    args = parser.parse_args()
+    
+    if args.force:
+        build_cube()
+    else:
+        ensure_cube()
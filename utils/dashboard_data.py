@@ -0,0 +1,151 @@
+import pandas as pd
+import numpy as np
+
+from utils.cube import load_cube, normalize_states
+from utils.data_loader import format_pincode, load_processed
+from utils.downsample import linear_fit
+from utils.metrics import add_metrics
+from utils.pincode_index import PincodeIndex
+
+# The data behind every dashboard page, without Streamlit: dashboard.py wraps these in its
+# caches and charts the results, utils/benchmark.py times them.
+
+# Columns each dataset needs across the pages (columnar reads skip everything else)
+AGE_COLS = ['age_0_5', 'age_5_17', 'age_18_greater', 'demo_age_5_17', 'demo_age_17_', 'bio_age_5_17', 'bio_age_17_']
+DASHBOARD_COLUMNS = {
+    'geographic_data': ['state', 'district', 'total_enrollments', 'total_updates'],
+    'age_demographics_data': ['state'] + AGE_COLS,
+    'update_behavior_data': ['state', 'district', 'total_demo_updates', 'total_bio_updates', 'update_to_enrollment_ratio'],
+    'anomaly_detection_data': ['state', 'district', 'total_enrollments', 'enr_z_score', 'demo_z_score', 'is_enr_anomaly', 'is_demo_anomaly'],
+    'predictive_data': ['state', 'district', 'total_enrollments', 'total_demo_updates', 'total_bio_updates'],
+    'pincode_data': ['pincode', 'state', 'district'] + AGE_COLS
+}
+
+# Short names of the activity columns in the correlation heatmap
+CORRELATION_LABELS = {'age_0_5': 'Child', 'age_5_17': 'Youth', 'age_18_greater': 'Adult',
+                      'demo_age_5_17': 'Demo_Y', 'demo_age_17_': 'Demo_A', 'bio_age_5_17': 'Bio_Y', 'bio_age_17_': 'Bio_A'}
+
+# Service gaps are ranked per state, district or pincode rollup
+GAP_LABELS = {'state': 'state_clean', 'district': 'district', 'pincode': 'pincode'}
+
+FORECAST_YEARS = list(range(2025, 2031))
+
+def load_tables(base_path='.'):
+    """Every processed table the pages read, with normalized states (rows without one dropped).
+    
+    The composite metrics the pages chart are derived here, once per data version.
+    """
+    def load(name):
+        return normalize_states(load_processed(name, DASHBOARD_COLUMNS[name], base_path))
+    geo_df = load('geographic_data')
+    age_df = load('age_demographics_data')
+    update_df = load('update_behavior_data')
+    anomaly_df = load('anomaly_detection_data')
+    predictive_df = load('predictive_data')
+    add_metrics(predictive_df, ['total_updates'])
+    pincode_df = add_metrics(load('pincode_data'), ['total_activity', 'update_type_index'])
+    return geo_df, age_df, update_df, anomaly_df, predictive_df, pincode_df
+
+def load_cube_tables(base_path='.'):
+    """The state/district rollups the pages chart, precomputed by utils/cube.py."""
+    return {
+        'geo_state': load_cube('geographic_data', 'state', ['state_clean', 'total_enrollments', 'total_updates', 'total_activity',
+                                                            'population_millions', 'activity_per_1000'], base_path),
+        'geo_district': load_cube('geographic_data', 'district', ['state_clean', 'district', 'total_enrollments'], base_path),
+        'update_state': load_cube('update_behavior_data', 'state', ['state_clean', 'total_demo_updates', 'total_bio_updates'], base_path),
+        'update_district': load_cube('update_behavior_data', 'district', ['state_clean', 'district', 'update_to_enrollment_ratio', 'n_rows'], base_path),
+        'anomaly_state': load_cube('anomaly_detection_data', 'state', ['state_clean', 'total_enrollments', 'is_enr_anomaly', 'is_demo_anomaly'], base_path)
+    }
+
+def load_pincode_index(base_path='.'):
+    """Drill-down index over the per-pincode rollup of pincode_data (see utils/pincode_index.py)."""
+    pincodes = load_cube('pincode_data', 'pincode', ['state_clean', 'district', 'pincode'] + AGE_COLS, base_path)
+    return PincodeIndex(add_metrics(pincodes, ['total_enrollments', 'total_updates', 'total_activity']))
+
+# --- Per-page data ---
+
+def overview(cube):
+    geo_state = cube['geo_state']
+    return {
+        'total_enrollments': geo_state['total_enrollments'].sum(),
+        'total_updates': geo_state['total_updates'].sum(),
+        'unique_districts': cube['geo_district']['district'].nunique(),
+        'top_states': geo_state.set_index('state_clean')['total_enrollments'].sort_values(ascending=False).head(10)
+    }
+
+def top_districts(cube, n=10):
+    return cube['geo_district'].groupby('district', observed=True)['total_enrollments'].sum().sort_values(ascending=False).head(n)
+
+def age_profile(age_df):
+    """Enrollment totals per age band, and demographic/biometric updates per cohort."""
+    enrollments = age_df[['age_0_5', 'age_5_17', 'age_18_greater']].sum()
+    update_types = pd.DataFrame({
+        'Age Group': ['Youth (5-17)', 'Adults (17+)'],
+        'Demographic': [age_df['demo_age_5_17'].sum(), age_df['demo_age_17_'].sum()],
+        'Biometric': [age_df['bio_age_5_17'].sum(), age_df['bio_age_17_'].sum()]
+    })
+    return enrollments, update_types
+
+def update_intensity(cube, n=15):
+    """Demographic/biometric totals, and the districts with the highest mean update ratio."""
+    totals = [cube['update_state']['total_demo_updates'].sum(), cube['update_state']['total_bio_updates'].sum()]
+    # Mean over every pincode of the district name, from the per-district sums and row counts
+    by_district = cube['update_district'].groupby('district', observed=True)[['update_to_enrollment_ratio', 'n_rows']].sum()
+    leaders = (by_district['update_to_enrollment_ratio'] / by_district['n_rows']).sort_values(ascending=False).head(n)
+    return totals, leaders
+
+def anomaly_outliers(cube, anomaly_df, n=12):
+    """Number of flagged clusters, and the rows of the n states with the most enrollments."""
+    anomaly_state = cube['anomaly_state']
+    flagged = anomaly_state['is_enr_anomaly'].sum() + anomaly_state['is_demo_anomaly'].sum()
+    top_states = anomaly_state.set_index('state_clean')['total_enrollments'].nlargest(n).index
+    return flagged, anomaly_df[anomaly_df['state_clean'].isin(top_states)]
+
+def service_gaps(grain, base_path='.'):
+    """Updates above what the enrollment base predicts, per rollup of `grain`, largest gap first."""
+    gaps = load_cube('predictive_data', grain, base_path=base_path)
+    add_metrics(gaps, ['total_updates'])
+    fit = linear_fit(gaps['total_enrollments'], gaps['total_updates'])
+    gaps['predicted_updates'] = fit['intercept'] + fit['slope'] * gaps['total_enrollments']
+    gaps['residual'] = gaps['total_updates'] - gaps['predicted_updates']
+    gaps['label'] = gaps[GAP_LABELS[grain]].astype(str)
+    if grain == 'pincode':
+        gaps['label'] = gaps['district'].astype(str) + ' · ' + format_pincode(gaps['pincode'])
+    return gaps.sort_values('residual', ascending=False, kind='stable').reset_index(drop=True)
+
+def activity_histogram(pincode_df, bins=100):
+    """Counts and edges of the per-pincode activity distribution."""
+    return np.histogram(pincode_df['total_activity'], bins=bins)
+
+def catchment(rows, n=20):
+    """Totals of a drill-down selection, and its n most active pincodes."""
+    totals = {
+        'pincodes': rows['pincode'].nunique(),
+        'total_enrollments': rows['total_enrollments'].sum(),
+        'total_updates': rows['total_updates'].sum()
+    }
+    top = rows.nlargest(n, 'total_activity').assign(label=lambda d: format_pincode(d['pincode']) + ' · ' + d['district'].astype(str))
+    return totals, top
+
+def relationships(pincode_df):
+    """Correlation of the activity columns, and the mean demographic/biometric index per state."""
+    corr = pincode_df[list(CORRELATION_LABELS)].rename(columns=CORRELATION_LABELS).corr()
+    st_idx = pincode_df.groupby('state_clean', observed=True)['update_type_index'].mean().sort_values()
+    return corr, st_idx
+
+def penetration(cube):
+    """Activity per 1000 people of every state with a known population (joined in the cube)."""
+    return cube['geo_state'].dropna(subset=['population_millions'])
+
+def state_inputs(cube, states):
+    """Default model inputs per state from the cube: enrollments, updates and a population proxy."""
+    totals = cube['geo_state'].assign(state_clean=lambda d: d['state_clean'].astype(str)).set_index('state_clean')
+    inputs = totals.reindex(states)[['total_enrollments', 'total_updates']].fillna(0).rename_axis('state').reset_index()
+    inputs['pop_millions'] = inputs['total_enrollments'] / 1000000 * 1.05
+    return inputs
+
+def demand_projection(cube, service):
+    """Demand for every state and forecast year, scored in one batched call."""
+    grid = service.projection_grid(state_inputs(cube, service.states)[['state', 'pop_millions', 'total_enrollments']],
+                                   FORECAST_YEARS)
+    return grid.pivot(index='state', columns='year', values='predicted')
@@ -1,20 +1,63 @@
 import pandas as pd
+import numpy as np
+import argparse
 import glob
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 
-def load_csv_files(directory_pattern, dataset_type='enrolment'):
-    """Load and concatenate all CSV files matching the directory pattern with optimized memory."""
-    files = glob.glob(directory_pattern)
-    if not files:
-        print(f"No files found for pattern: {directory_pattern}")
-        return pd.DataFrame()
-    
+KEY_COLS = ['state', 'district', 'pincode']
+
+# Raw shards carry the activity date as dd-mm-yyyy
+DATE_COL = 'date'
+DATE_FORMAT = '%d-%m-%Y'
+DAILY_KEYS = [DATE_COL] + KEY_COLS
+
+PROCESSED_DIR = 'processed_data'
+
+# Raw shard directory for each dataset type
+RAW_DIRS = {
+    'enrolment': 'api_data_aadhar_enrolment',
+    'demographic': 'api_data_aadhar_demographic',
+    'biometric': 'api_data_aadhar_biometric'
+}
+
+# Canonical merged pincode-level table shared by every preprocessing notebook
+MASTER_NAME = 'master_pincode_data'
+
+# The same counts per day and per calendar month (month = first day of the month)
+DAILY_NAME = 'daily_pincode_data'
+MONTHLY_NAME = 'monthly_pincode_data'
+MONTH_COL = 'month'
+
+# Count columns are stored as int32; ratios, z-scores and flags keep their own dtypes
+COUNT_PREFIXES = ('age_', 'demo_age_', 'bio_age_', 'total_')
+
+# Persistent dictionary giving every state and district name a stable integer code. Codes
+# are only ever appended, so stored tables stay valid as new names arrive. In memory the
+# columns are categoricals over the whole dictionary, so frames of every stage share one
+# dtype and join and group on the codes; on disk they are the int32 codes themselves.
+KEY_DICTIONARY = 'key_dictionary.json'
+CODED_COLS = ['state', 'district']
+
+# Pincodes are int32 everywhere (-1 when missing or malformed), formatted on output
+PINCODE_DTYPE = 'int32'
+PINCODE_WIDTH = 6
+
+def get_dtype_map(dataset_type='enrolment'):
+    """Return the read_csv dtype map for one raw dataset type."""
     # Define optimal dtypes for memory and speed
-    # Note: pincode must be string to preserve leading zeros and avoid mixed-type issues
+    # Keys are read as category so every distinct value is parsed (and encoded) only once;
+    # pincodes become int32 in encode_keys, which tolerates malformed values
     dtype_map = {
+        # Read as category so every distinct date string is parsed only once
+        'date': 'category',
         'state': 'category',
         'district': 'category',
-        'pincode': str
+        'pincode': 'category'
     }
     
     # Specific numeric columns for each dataset
@@ -24,38 +67,408 @@ def load_csv_files(directory_pattern, dataset_type='enrolment'):
         dtype_map.update({'demo_age_5_17': 'int32', 'demo_age_17_': 'int32'})
     elif dataset_type == 'biometric':
         dtype_map.update({'bio_age_5_17': 'int32', 'bio_age_17_': 'int32'})
+    return dtype_map
+
+def parse_dates(df):
+    """Convert the raw date column to datetime64, parsing each distinct value once."""
+    if DATE_COL not in df.columns:
+        return df
+    dates = df[DATE_COL].astype('category')
+    parsed = pd.to_datetime(dates.cat.categories, format=DATE_FORMAT)
+    # Code -1 marks a missing date
+    df[DATE_COL] = parsed.take(dates.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT)
+    return df
+
+@contextmanager
+def file_lock(lock_path, timeout=60):
+    """Serialise read-modify-write of a shared file across processes (an O_EXCL lock file)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not lock {lock_path}; remove it if no pipeline is running")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+def _dictionary_path(base_path='.'):
+    return os.path.join(base_path, PROCESSED_DIR, KEY_DICTIONARY)
+
+@lru_cache(maxsize=8)
+def _read_dictionary(path, mtime_ns):
+    with open(path, 'r', encoding='utf-8') as f:
+        names = json.load(f)
+    return {col: pd.CategoricalDtype(names.get(col, [])) for col in CODED_COLS}
+
+def key_dtypes(base_path='.'):
+    """Categorical dtype of every coded key column, over the whole key dictionary."""
+    path = _dictionary_path(base_path)
+    if not os.path.exists(path):
+        return {col: pd.CategoricalDtype([]) for col in CODED_COLS}
+    return _read_dictionary(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+def _extend_dictionary(new_names, base_path='.'):
+    """Append the names the dictionary lacks and return the new key dtypes.
     
-    df_list = []
-    for file in files:
-        # engine='c' is default and fast; low_memory=False avoids warnings
-        df = pd.read_csv(file, dtype=dtype_map, low_memory=False)
-        df_list.append(df)
+    The dictionary is re-read under a lock, so concurrent writers never hand out the same
+    code twice; names another process added meanwhile keep its codes.
+    """
+    path = _dictionary_path(base_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(f"{path}.lock"):
+        names = {col: list(dtype.categories) for col, dtype in key_dtypes(base_path).items()}
+        for col, values in new_names.items():
+            known = set(names[col])
+            names[col].extend(value for value in values if value not in known)
+        # Write-then-rename so concurrent readers never see a half-written dictionary
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(names, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    return key_dtypes(base_path)
+
+def encode_keys(df, base_path='.', extend=False):
+    """Encode df's key columns in place and return it.
+    
+    State and district names become categoricals over the key dictionary; pincodes become
+    int32. Every distinct value is looked up once, not every row. Names the dictionary lacks
+    are appended to it only with `extend` (ingestion and table writes); read paths give them
+    codes past its end in this frame alone, so they never write the dictionary.
+    """
+    dtypes = key_dtypes(base_path)
+    values = {col: df[col].astype('category') for col in CODED_COLS
+              if col in df.columns and df[col].dtype != dtypes[col]}
+    new_names = {}
+    for col, series in values.items():
+        names = series.cat.categories.astype(str)
+        unseen = names[dtypes[col].categories.get_indexer(names) < 0]
+        if len(unseen):
+            new_names[col] = list(unseen)
+    if new_names and extend:
+        dtypes = _extend_dictionary(new_names, base_path)
+    elif new_names:
+        dtypes = {**dtypes, **{col: pd.CategoricalDtype(list(dtypes[col].categories) + names)
+                               for col, names in new_names.items()}}
     
-    return pd.concat(df_list, ignore_index=True)
+    for col, series in values.items():
+        lookup = dtypes[col].categories.get_indexer(series.cat.categories.astype(str))
+        codes = series.cat.codes.to_numpy()
+        df[col] = pd.Categorical.from_codes(np.where(codes >= 0, lookup[codes], -1), dtype=dtypes[col], validate=False)
+    
+    if 'pincode' in df.columns and df['pincode'].dtype != PINCODE_DTYPE:
+        pincodes = df['pincode'].astype('category')
+        numbers = pd.to_numeric(pincodes.cat.categories.astype(str), errors='coerce')
+        lookup = np.nan_to_num(numbers.to_numpy(dtype=float), nan=-1).astype(PINCODE_DTYPE)
+        codes = pincodes.cat.codes.to_numpy()
+        df['pincode'] = np.where(codes >= 0, lookup[codes], -1).astype(PINCODE_DTYPE)
+    return df
 
-def load_enrollment_data(base_path='.'):
-    pattern = os.path.join(base_path, 'api_data_aadhar_enrolment', '*.csv')
-    return load_csv_files(pattern, 'enrolment')
+def key_codes(df):
+    """A copy of df with the coded key columns as their int32 dictionary codes, for storage."""
+    coded = [col for col in CODED_COLS if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)]
+    return df.assign(**{col: df[col].cat.codes.astype('int32') for col in coded})
 
-def load_demographic_data(base_path='.'):
-    pattern = os.path.join(base_path, 'api_data_aadhar_demographic', '*.csv')
-    return load_csv_files(pattern, 'demographic')
+def decode_keys(df, base_path='.'):
+    """Turn stored int32 key codes back into categoricals over the key dictionary, in place.
+    
+    Frames whose keys are still names (tables written before the dictionary existed) are
+    encoded instead.
+    """
+    dtypes = key_dtypes(base_path)
+    for col in CODED_COLS:
+        if col not in df.columns or not pd.api.types.is_integer_dtype(df[col].dtype):
+            continue
+        codes = df[col].to_numpy()
+        if len(codes) and codes.max() >= len(dtypes[col].categories):
+            raise ValueError(f"'{col}' codes exceed the key dictionary in {_dictionary_path(base_path)}; "
+                             "rebuild with `python -m utils.incremental --full`")
+        df[col] = pd.Categorical.from_codes(codes, dtype=dtypes[col], validate=False)
+    return encode_keys(df, base_path)
 
-def load_biometric_data(base_path='.'):
-    pattern = os.path.join(base_path, 'api_data_aadhar_biometric', '*.csv')
-    return load_csv_files(pattern, 'biometric')
+def align_keys(frames):
+    """Give every frame's coded key columns the newest dictionary dtype among them, in place.
+    
+    Frames encoded before the dictionary grew have a shorter category list; codes are
+    append-only, so widening keeps every code and lets merges and concats stay categorical.
+    """
+    for col in CODED_COLS:
+        dtypes = [df[col].dtype for df in frames if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)]
+        if not dtypes:
+            continue
+        widest = max(dtypes, key=lambda dtype: len(dtype.categories))
+        for df in frames:
+            if col in df.columns and df[col].dtype != widest:
+                df[col] = pd.Categorical.from_codes(df[col].cat.codes, dtype=widest, validate=False)
+    return frames
 
-def merge_all_datasets(enr_df, demo_df, bio_df):
-    """Merge enrollment, demographic, and biometric datasets on key columns with optimized grouping."""
-    key_cols = ['state', 'district', 'pincode']
+def format_pincode(values):
+    """Pincodes as zero-padded PINCODE_WIDTH-digit strings (missing ones as '')."""
+    pincodes = pd.Series(values)
+    return pincodes.astype(str).str.zfill(PINCODE_WIDTH).where(pincodes >= 0, '')
+
+def _read_shard(file, dtype_map):
+    # engine='c' is default and fast; low_memory=False avoids warnings
+    return parse_dates(pd.read_csv(file, dtype=dtype_map, low_memory=False))
+
+def _concat_shards(df_list, base_path='.'):
+    """Concatenate shards with their keys encoded, so the categoricals share one dtype."""
+    # Encoded one after another: the dictionary only grows in this process
+    return pd.concat(align_keys([encode_keys(df, base_path, extend=True) for df in df_list]), ignore_index=True)
+
+def read_csv_shards(files, dataset_type='enrolment', n_workers=1, use_processes=False, base_path='.'):
+    """Read the given shard files in order and concatenate them, keys encoded (see encode_keys).
+    
+    With n_workers > 1 the shards are parsed concurrently (threads by default, processes
+    with use_processes=True) and concatenated in the given order, so the result is
+    identical to the sequential read. n_workers=None uses every core. The key dictionary
+    lives under base_path.
+    """
+    dtype_map = get_dtype_map(dataset_type)
+    n_workers = min(n_workers or os.cpu_count() or 1, len(files))
+    
+    if n_workers <= 1:
+        df_list = [_read_shard(file, dtype_map) for file in files]
+    else:
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_cls(max_workers=n_workers) as executor:
+            # map() yields results in submission order regardless of completion order
+            df_list = list(executor.map(_read_shard, files, [dtype_map] * len(files)))
+    
+    return _concat_shards(df_list, base_path)
+
+def empty_shard(dataset_type='enrolment', base_path='.'):
+    """A zero-row frame typed like the parsed, encoded shards of dataset_type.
+    
+    Stands in for a dataset without any shards, so it aggregates and merges like the others
+    (contributing its count columns, all zero).
+    """
+    dtype_map = get_dtype_map(dataset_type)
+    empty = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtype_map.items()})
+    return encode_keys(parse_dates(empty), base_path)
+
+def load_csv_files(directory_pattern, dataset_type='enrolment', n_workers=1, use_processes=False, base_path='.'):
+    """Load and concatenate all CSV files matching the directory pattern with optimized memory.
+    
+    Shards are read in sorted file order; see read_csv_shards for the parallel options.
+    Without any matching shard the result is an empty_shard.
+    """
+    files = sorted(glob.glob(directory_pattern))
+    if not files:
+        print(f"No files found for pattern: {directory_pattern}")
+        return empty_shard(dataset_type, base_path)
     
+    return read_csv_shards(files, dataset_type, n_workers, use_processes, base_path)
+
+def load_enrollment_data(base_path='.', n_workers=1):
+    pattern = os.path.join(base_path, RAW_DIRS['enrolment'], '*.csv')
+    return load_csv_files(pattern, 'enrolment', n_workers, base_path=base_path)
+
+def load_demographic_data(base_path='.', n_workers=1):
+    pattern = os.path.join(base_path, RAW_DIRS['demographic'], '*.csv')
+    return load_csv_files(pattern, 'demographic', n_workers, base_path=base_path)
+
+def load_biometric_data(base_path='.', n_workers=1):
+    pattern = os.path.join(base_path, RAW_DIRS['biometric'], '*.csv')
+    return load_csv_files(pattern, 'biometric', n_workers, base_path=base_path)
+
+def aggregate_by_key(df, keys=KEY_COLS):
+    """Sum every numeric column per (state, district, pincode), or per `keys`."""
     # Aggregating with numeric_only=True is CRITICAL for speed (stops string concatenation)
-    enr_agg = enr_df.groupby(key_cols).sum(numeric_only=True).reset_index()
-    demo_agg = demo_df.groupby(key_cols).sum(numeric_only=True).reset_index()
-    bio_agg = bio_df.groupby(key_cols).sum(numeric_only=True).reset_index()
+    # observed=True keeps only real (state, district, pincode) combinations instead of
+    # the cartesian product of the categorical levels
+    return df.groupby(keys, observed=True).sum(numeric_only=True).reset_index()
+
+def align_aggregates(aggregates, keys=KEY_COLS):
+    """Outer-join per-key aggregates in one pass, with 0 where a frame lacks a key.
+    
+    Same rows as chained outer merges followed by fillna(0), sorted by key, but the keys are
+    matched once: every frame's key rows are stacked and numbered by group, and each frame's
+    metric columns are scattered straight into one zero-filled matrix.
+    """
+    value_cols = [[col for col in df.columns if col not in keys] for df in aggregates]
+    all_cols = [col for cols in value_cols for col in cols]
+    if len(set(all_cols)) != len(all_cols):
+        raise ValueError(f"Aggregates share metric columns: {sorted({c for c in all_cols if all_cols.count(c) > 1})}")
+    
+    # Same key dtypes everywhere, so the keys group on their codes and stay categorical
+    align_keys(aggregates)
+    stacked = pd.concat([df[keys] for df in aggregates], ignore_index=True)
+    grouped = stacked.groupby(keys, observed=True, sort=True)
+    row = grouped.ngroup().to_numpy()
+    first = np.flatnonzero(grouped.cumcount().to_numpy() == 0)
+    merged = stacked.iloc[first[np.argsort(row[first])]].reset_index(drop=True)
+    
+    # Empty frames (a dataset without shards, see empty_shard) only add zero columns
+    dtypes = [df[cols].to_numpy().dtype for df, cols in zip(aggregates, value_cols) if len(df) and cols]
+    values = np.zeros((len(merged), len(all_cols)), dtype=np.result_type(*dtypes) if dtypes else 'int64')
+    start, col = 0, 0
+    for df, cols in zip(aggregates, value_cols):
+        if len(df):
+            values[row[start:start + len(df)], col:col + len(cols)] = df[cols].to_numpy()
+        start += len(df)
+        col += len(cols)
+    return pd.concat([merged, pd.DataFrame(values, columns=all_cols)], axis=1)
+
+def merge_aggregates(enr_agg, demo_agg, bio_agg, keys=KEY_COLS):
+    """Outer-join the three per-key aggregates into one pincode-level frame (0 where absent)."""
+    return align_aggregates([enr_agg, demo_agg, bio_agg], keys)
+
+def merge_all_datasets(enr_df, demo_df, bio_df, keys=KEY_COLS):
+    """Merge enrollment, demographic, and biometric datasets on key columns with optimized grouping."""
+    enr_agg = aggregate_by_key(enr_df, keys)
+    demo_agg = aggregate_by_key(demo_df, keys)
+    bio_agg = aggregate_by_key(bio_df, keys)
     
     # Basic merge
-    merged = pd.merge(enr_agg, demo_agg, on=key_cols, how='outer', suffixes=('_enr', '_demo'))
-    merged = pd.merge(merged, bio_agg, on=key_cols, how='outer', suffixes=('', '_bio'))
+    return merge_aggregates(enr_agg, demo_agg, bio_agg, keys)
+
+def monthly_rollup(daily):
+    """Sum a daily table per (month, state, district, pincode)."""
+    months = daily[DATE_COL].dt.to_period('M').dt.to_timestamp().rename(MONTH_COL)
+    monthly = daily.drop(columns=DATE_COL).groupby([months] + KEY_COLS, observed=True)
+    return monthly.sum(numeric_only=True).reset_index()
+
+def _fold_partials(partials, keys=KEY_COLS):
+    return aggregate_by_key(pd.concat(align_keys(partials), ignore_index=True), keys)
+
+def stream_aggregate_shards(files, dataset_type='enrolment', chunksize=500_000, keys=KEY_COLS, base_path='.'):
+    """Aggregate the given shards per (state, district, pincode) without loading them whole.
+    
+    Each shard is read in chunks of `chunksize` rows; every chunk is reduced to per-key sums
+    and folded into the running totals, so peak memory follows the number of distinct keys
+    rather than the raw row count.
+    """
+    dtype_map = get_dtype_map(dataset_type)
+    partials = []
+    buffered_rows = 0
+    for file in files:
+        for chunk in pd.read_csv(file, dtype=dtype_map, chunksize=chunksize, low_memory=False):
+            partial = aggregate_by_key(encode_keys(parse_dates(chunk), base_path, extend=True), keys)
+            partials.append(partial)
+            buffered_rows += len(partial)
+            # Fold once the buffered partial sums reach a chunk's worth of rows
+            if len(partials) > 1 and buffered_rows >= chunksize:
+                partials = [_fold_partials(partials, keys)]
+                buffered_rows = len(partials[0])
+    
+    return _fold_partials(partials, keys)
+
+def stream_aggregate_csv_files(directory_pattern, dataset_type='enrolment', chunksize=500_000, keys=KEY_COLS,
+                               base_path='.'):
+    """Streaming per-key sums of all shards matching the pattern (see stream_aggregate_shards)."""
+    files = sorted(glob.glob(directory_pattern))
+    if not files:
+        print(f"No files found for pattern: {directory_pattern}")
+        return aggregate_by_key(empty_shard(dataset_type, base_path), keys)
+    return stream_aggregate_shards(files, dataset_type, chunksize, keys, base_path)
+
+def stream_merge_all_datasets(base_path='.', chunksize=500_000, keys=KEY_COLS):
+    """Streaming equivalent of merge_all_datasets over the raw shards under base_path."""
+    enr_agg = stream_aggregate_csv_files(os.path.join(base_path, RAW_DIRS['enrolment'], '*.csv'), 'enrolment', chunksize, keys, base_path)
+    demo_agg = stream_aggregate_csv_files(os.path.join(base_path, RAW_DIRS['demographic'], '*.csv'), 'demographic', chunksize, keys, base_path)
+    bio_agg = stream_aggregate_csv_files(os.path.join(base_path, RAW_DIRS['biometric'], '*.csv'), 'biometric', chunksize, keys, base_path)
+    return merge_aggregates(enr_agg, demo_agg, bio_agg, keys)
+
+def optimize_dtypes(df, base_path='.', extend=False):
+    """Apply the in-memory schema: dictionary-encoded state/district, int32 pincode and counts.
+    
+    `extend` adds unseen names to the key dictionary (see encode_keys).
+    """
+    df = encode_keys(df.copy(), base_path, extend)
+    count_cols = [c for c in df.columns if c.startswith(COUNT_PREFIXES)]
+    df[count_cols] = df[count_cols].astype('int32')
+    return df
+
+def save_processed(df, name, base_path='.'):
+    """Write a processed table to processed_data/<name>.parquet with the typed storage schema.
+    
+    Keys are stored as int32 codes of the key dictionary in the same directory.
+    """
+    output_dir = os.path.join(base_path, PROCESSED_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{name}.parquet")
+    key_codes(optimize_dtypes(df, base_path, extend=True)).to_parquet(output_path, index=False)
+    return output_path
+
+def load_processed(name, columns=None, base_path='.', filters=None):
+    """Load a processed table, reading only the requested columns.
     
-    return merged
+    Parquet is preferred; the legacy processed_data/<name>.csv is used when no Parquet
+    file exists yet so older snapshots keep working. `filters` (pyarrow row filters, e.g.
+    [('date', '>=', start)]) only apply to Parquet tables. Keys come back encoded (see
+    encode_keys).
+    """
+    parquet_path = os.path.join(base_path, PROCESSED_DIR, f"{name}.parquet")
+    if os.path.exists(parquet_path):
+        return decode_keys(pd.read_parquet(parquet_path, columns=columns, filters=filters), base_path)
+    
+    csv_path = os.path.join(base_path, PROCESSED_DIR, f"{name}.csv")
+    df = pd.read_csv(csv_path, usecols=columns, dtype={'pincode': str})
+    if columns is not None:
+        df = df[columns]
+    return optimize_dtypes(df, base_path)
+
+def save_rollups(daily, base_path='.'):
+    """Write the daily table and its monthly and all-time rollups; return the all-time master."""
+    daily = optimize_dtypes(daily, base_path, extend=True).sort_values(DAILY_KEYS, ignore_index=True)
+    save_processed(daily, DAILY_NAME, base_path)
+    save_processed(monthly_rollup(daily).sort_values([MONTH_COL] + KEY_COLS, ignore_index=True),
+                   MONTHLY_NAME, base_path)
+    
+    master = optimize_dtypes(aggregate_by_key(daily), base_path, extend=True)
+    # Canonical row order (by key code, i.e. the order names were first seen)
+    master = master.sort_values(KEY_COLS, ignore_index=True)
+    output_path = save_processed(master, MASTER_NAME, base_path)
+    print(f"Master table saved to {output_path} ({len(master)} rows, {len(daily)} daily rows)")
+    return master
+
+def build_master_data(base_path='.', n_workers=1, chunksize=None):
+    """Parse the raw shards once and write the canonical merged pincode-level table.
+    
+    Shards are aggregated per (date, state, district, pincode) first; the daily table, its
+    monthly rollup and the all-time master are all written from that. With `chunksize`
+    set the shards are streamed and aggregated chunk by chunk instead of being loaded in
+    full, for raw histories that do not fit in memory.
+    """
+    if chunksize:
+        print(f"Streaming raw shards in chunks of {chunksize} rows...")
+        merged = stream_merge_all_datasets(base_path, chunksize, DAILY_KEYS)
+    else:
+        enr_df = load_enrollment_data(base_path, n_workers)
+        demo_df = load_demographic_data(base_path, n_workers)
+        bio_df = load_biometric_data(base_path, n_workers)
+        print(f"Enrollment records: {len(enr_df)}")
+        print(f"Demographic update records: {len(demo_df)}")
+        print(f"Biometric update records: {len(bio_df)}")
+        merged = merge_all_datasets(enr_df, demo_df, bio_df, DAILY_KEYS)
+    
+    # Missing combinations (no enrollments/updates in that area on that day) are already 0
+    return save_rollups(merged, base_path)
+
+def load_date_range(start=None, end=None, columns=None, base_path='.', monthly=False):
+    """Daily (or monthly) rows between `start` and `end` inclusive, without touching raw data.
+    
+    Rollups are stored sorted by date, so the Parquet reader skips row groups outside the range.
+    """
+    name, date_col = (MONTHLY_NAME, MONTH_COL) if monthly else (DAILY_NAME, DATE_COL)
+    filters = []
+    if start is not None:
+        filters.append((date_col, '>=', pd.Timestamp(start)))
+    if end is not None:
+        filters.append((date_col, '<=', pd.Timestamp(end)))
+    return load_processed(name, columns, base_path, filters or None)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the canonical master table from the raw shards.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Number of shards parsed concurrently (default: all cores, 1 = sequential)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream shards in chunks of this many rows instead of loading them whole")
+    args = parser.parse_args()
+    build_master_data(n_workers=args.workers, chunksize=args.chunksize)
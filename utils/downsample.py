@@ -0,0 +1,79 @@
+import pandas as pd
+import numpy as np
+
+# Scatter plots send at most this many points to the browser
+DEFAULT_MAX_POINTS = 5000
+# Cells per axis of the grid the remaining points are thinned on
+GRID_BINS = 100
+# Rows at or beyond this percentile on either axis always stay
+OUTLIER_QUANTILE = 0.995
+
+def _pct_rank(values):
+    return np.nan_to_num(pd.Series(values).rank(pct=True).to_numpy(), nan=0.0)
+
+def _grid_cells(xs, ys, bins):
+    def axis(values):
+        lo, hi = np.nanmin(values), np.nanmax(values)
+        scaled = (values - lo) / (hi - lo) if hi > lo else np.zeros_like(values)
+        return np.clip(np.nan_to_num(scaled * bins, nan=0.0).astype(np.int64), 0, bins - 1)
+    return axis(xs) * bins + axis(ys)
+
+def _cell_cap(counts, budget):
+    """Largest per-cell cap c with sum(min(count, c)) <= budget (binary search)."""
+    lo, hi = 0, int(counts.max())
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if np.minimum(counts, mid).sum() <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def downsample(df, x, y, keep=None, max_points=DEFAULT_MAX_POINTS, bins=GRID_BINS, seed=0):
+    """Return at most `max_points` rows of df for an x/y scatter, in their original order.
+    
+    Rows flagged in any of the boolean `keep` columns (e.g. anomalies) and rows in the
+    outer OUTLIER_QUANTILE tail of either axis are kept first (flagged, then most extreme,
+    if they alone exceed the budget). The rest are thinned on a bins x bins grid with the same cap
+    per occupied cell, so sparse regions keep every point and dense ones a random few.
+    """
+    if len(df) <= max_points:
+        return df
+    xs = df[x].to_numpy(dtype=float)
+    ys = df[y].to_numpy(dtype=float)
+    
+    extremity = np.maximum(_pct_rank(xs), _pct_rank(ys))
+    flagged = np.zeros(len(df), dtype=bool)
+    for col in keep or []:
+        flagged |= df[col].to_numpy(dtype=bool)
+    forced = flagged | (extremity >= OUTLIER_QUANTILE)
+    forced_idx = np.flatnonzero(forced)
+    if len(forced_idx) > max_points:
+        # Flagged rows first, then the most extreme outliers
+        priority = np.lexsort((-extremity[forced_idx], ~flagged[forced_idx]))
+        forced_idx = forced_idx[priority[:max_points]]
+    
+    rest = np.flatnonzero(~forced)
+    budget = max_points - len(forced_idx)
+    chosen = np.empty(0, dtype=np.int64)
+    if budget > 0 and len(rest):
+        order = rest[np.random.default_rng(seed).permutation(len(rest))]
+        cells = _grid_cells(xs[order], ys[order], bins)
+        rank_in_cell = pd.Series(cells).groupby(cells).cumcount().to_numpy()
+        cap = _cell_cap(np.bincount(cells), budget)
+        # With more occupied cells than budget, one point from a random subset of cells
+        chosen = order[rank_in_cell < max(cap, 1)][:budget]
+    
+    return df.iloc[np.sort(np.concatenate([forced_idx, chosen]))]
+
+def linear_fit(x, y):
+    """Least-squares line through the non-null (x, y) pairs: {'slope', 'intercept', 'r2'}."""
+    xs = np.asarray(x, dtype=float)
+    ys = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(xs) | np.isnan(ys))
+    xs, ys = xs[valid], ys[valid]
+    slope, intercept = np.polyfit(xs, ys, 1)
+    residual = ys - (slope * xs + intercept)
+    total = ((ys - ys.mean()) ** 2).sum()
+    r2 = 1 - (residual ** 2).sum() / total if total > 0 else 0.0
+    return {'slope': float(slope), 'intercept': float(intercept), 'r2': float(r2)}
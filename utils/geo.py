@@ -0,0 +1,212 @@
+import numpy as np
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+
+# Local store of India boundary GeoJSON, so choropleths never wait on (or fail without) the
+# network. Sources are fetched once with `python -m utils.geo --fetch` (or imported from a
+# file with --import on air-gapped machines) and simplified at every DETAILS tolerance.
+GEO_DIR = os.path.join('assets', 'geo')
+GEO_MANIFEST = os.path.join(GEO_DIR, 'manifest.json')
+
+GEO_SOURCES = {
+    'state': 'https://raw.githubusercontent.com/geohacker/india/master/state/india_state.geojson',
+    'district': 'https://raw.githubusercontent.com/geohacker/india/master/district/india_district.geojson'
+}
+
+# Property the dashboard's names match, as plotly's featureidkey
+FEATURE_KEYS = {
+    'state': 'properties.NAME_1',
+    'district': 'properties.NAME_2'
+}
+
+# Douglas-Peucker tolerance in degrees (0.01 is roughly 1 km)
+DETAILS = {
+    'full': 0.0,
+    'medium': 0.01,
+    'low': 0.05
+}
+DEFAULT_DETAIL = 'medium'
+
+def _source_path(level, base_path='.'):
+    return os.path.join(base_path, GEO_DIR, f"india_{level}.source.geojson")
+
+def _asset_path(level, detail, base_path='.'):
+    return os.path.join(base_path, GEO_DIR, f"india_{level}.{detail}.geojson")
+
+def _simplify_mask(points, tolerance):
+    """Douglas-Peucker keep-mask for one line of points (iterative, vectorized per segment)."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        inner = points[start + 1:end]
+        a, b = points[start], points[end]
+        ab = b - a
+        length = np.hypot(*ab)
+        if length == 0:
+            # Closed ring: measure from the shared start/end point
+            dist = np.hypot(*(inner - a).T)
+        else:
+            dist = np.abs(ab[0] * (inner[:, 1] - a[1]) - ab[1] * (inner[:, 0] - a[0])) / length
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance:
+            split = start + 1 + idx
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+def _simplify_polygon(rings, tolerance, decimals):
+    """Simplify a polygon's rings; None when the exterior collapses, collapsed holes are dropped."""
+    result = []
+    for ring in rings:
+        points = np.asarray(ring, dtype=float)[:, :2]
+        if tolerance > 0:
+            points = points[_simplify_mask(points, tolerance)]
+        if len(points) < 4:
+            if not result:
+                return None
+            continue
+        result.append(np.round(points, decimals).tolist())
+    return result
+
+def simplify_geometry(geometry, tolerance):
+    """Return a Polygon/MultiPolygon geometry simplified to `tolerance` degrees.
+    
+    Parts too small to survive the tolerance are dropped, unless that would drop all of them.
+    """
+    # ~1 m precision at full detail, coarser coordinates as the tolerance grows
+    decimals = 5 if tolerance <= 0 else max(2, int(-np.floor(np.log10(tolerance))) + 1)
+    polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+    simplified = [p for p in (_simplify_polygon(rings, tolerance, decimals) for rings in polygons) if p]
+    if not simplified:
+        return geometry
+    if geometry['type'] == 'MultiPolygon':
+        return {'type': 'MultiPolygon', 'coordinates': simplified}
+    return {'type': 'Polygon', 'coordinates': simplified[0]}
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def fetch_sources(levels=None, base_path='.'):
+    """Download the source GeoJSON of each level into the store (the only networked step)."""
+    import requests
+    os.makedirs(os.path.join(base_path, GEO_DIR), exist_ok=True)
+    for level in levels or list(GEO_SOURCES):
+        print(f"Fetching {GEO_SOURCES[level]}...")
+        response = requests.get(GEO_SOURCES[level], timeout=60)
+        response.raise_for_status()
+        with open(_source_path(level, base_path), 'wb') as f:
+            f.write(response.content)
+
+def import_source(level, path, base_path='.'):
+    """Copy a GeoJSON file obtained elsewhere into the store as the source of `level`."""
+    if level not in GEO_SOURCES:
+        raise ValueError(f"Unknown level '{level}', expected one of {list(GEO_SOURCES)}")
+    os.makedirs(os.path.join(base_path, GEO_DIR), exist_ok=True)
+    shutil.copyfile(path, _source_path(level, base_path))
+
+def build_assets(base_path='.'):
+    """Write every stored source at every detail and record them in the manifest.
+    
+    The manifest's `version` changes whenever any source geometry does.
+    """
+    manifest = {'levels': {}}
+    version = hashlib.sha256()
+    for level in GEO_SOURCES:
+        source = _source_path(level, base_path)
+        if not os.path.exists(source):
+            continue
+        sha256 = _file_sha256(source)
+        version.update(f"{level}:{sha256}".encode('utf-8'))
+        with open(source, 'r', encoding='utf-8') as f:
+            collection = json.load(f)
+        
+        files = {}
+        for detail, tolerance in DETAILS.items():
+            features = [{**feature, 'geometry': simplify_geometry(feature['geometry'], tolerance)}
+                        if feature.get('geometry') else feature
+                        for feature in collection['features']]
+            path = _asset_path(level, detail, base_path)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'type': 'FeatureCollection', 'features': features}, f, separators=(',', ':'))
+            files[detail] = {'file': os.path.basename(path), 'bytes': os.path.getsize(path)}
+            print(f"{level}/{detail}: {len(features)} features, {files[detail]['bytes'] / 1e6:.2f} MB")
+        manifest['levels'][level] = {'source': GEO_SOURCES[level], 'sha256': sha256,
+                                     'feature_key': FEATURE_KEYS[level], 'files': files}
+    
+    if not manifest['levels']:
+        raise FileNotFoundError(f"No GeoJSON sources in {os.path.join(base_path, GEO_DIR)}; "
+                                "run `python -m utils.geo --fetch` or `--import LEVEL FILE` first")
+    manifest['version'] = version.hexdigest()[:12]
+    with open(os.path.join(base_path, GEO_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def ensure_store(base_path='.'):
+    """Build the store unless it has a manifest already, fetching the sources if none are stored.
+    
+    Returns the manifest, or None when the sources cannot be obtained (offline, no requests);
+    choropleths are then skipped instead of failing.
+    """
+    manifest_path = os.path.join(base_path, GEO_MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    try:
+        if not any(os.path.exists(_source_path(level, base_path)) for level in GEO_SOURCES):
+            fetch_sources(base_path=base_path)
+        return build_assets(base_path)
+    except (ImportError, OSError) as e:
+        # requests' errors are OSErrors too
+        print(f"⚠️ GeoJSON store not built ({e}); choropleths will be skipped. Run "
+              "`python -m utils.geo --fetch` with network access, or `--import LEVEL FILE`.")
+        return None
+
+@lru_cache(maxsize=8)
+def _read_asset(path, mtime_ns):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_geojson(level='state', detail=DEFAULT_DETAIL, base_path='.'):
+    """Load boundaries from the local store, read from disk once per process and file version.
+    
+    The returned dict is shared between callers and must not be modified.
+    """
+    if detail not in DETAILS:
+        raise ValueError(f"Unknown detail '{detail}', expected one of {list(DETAILS)}")
+    path = _asset_path(level, detail, base_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {level} boundaries at {path}; build the local GeoJSON store "
+                                f"with `python -m utils.geo --fetch` (or `--import {level} FILE` offline)")
+    return _read_asset(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the local, simplified India GeoJSON store.")
+    parser.add_argument('--fetch', action='store_true', help="Download the source GeoJSON first (needs network)")
+    parser.add_argument('--import', dest='import_source', nargs=2, metavar=('LEVEL', 'FILE'), action='append',
+                        help="Use a local GeoJSON file as the source of LEVEL (state or district)")
+    parser.add_argument('--ensure', action='store_true',
+                        help="Only build the store if it is missing, and warn instead of failing when offline")
+    args = parser.parse_args()
+    
+    if args.ensure:
+        ensure_store()
+        raise SystemExit(0)
+    if args.fetch:
+        fetch_sources()
+    for level, path in args.import_source or []:
+        import_source(level, path)
+    manifest = build_assets()
+    print(f"GeoJSON store version {manifest['version']}")
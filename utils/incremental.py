@@ -0,0 +1,258 @@
+import pandas as pd
+import argparse
+import hashlib
+import json
+import os
+
+from utils.data_loader import (DAILY_KEYS, DAILY_NAME, KEY_COLS, MASTER_NAME, MONTHLY_NAME, PROCESSED_DIR, RAW_DIRS,
+                               aggregate_by_key, align_keys, build_master_data, decode_keys, empty_shard, encode_keys,
+                               file_lock, key_codes, load_processed, merge_aggregates, read_csv_shards, save_processed,
+                               save_rollups, stream_aggregate_shards)
+
+# Ingested shards, the master version and the version each processed table was built from
+MANIFEST_FILE = 'ingest_manifest.json'
+
+# Keys touched by each incremental refresh, tagged with the master version that touched them
+DELTA_NAME = 'master_delta'
+
+# Held for a whole refresh; a full rebuild of a large dataset can take a while
+REFRESH_LOCK_FILE = 'ingest.lock'
+REFRESH_LOCK_TIMEOUT = 6 * 3600
+
+def _file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def scan_shards(base_path='.', known=None):
+    """Fingerprint every raw shard by name, size and SHA-256.
+    
+    Files whose size and mtime match `known` reuse the recorded hash instead of re-reading them.
+    """
+    known = known or {}
+    shards = {}
+    for dataset_type, raw_dir in RAW_DIRS.items():
+        directory = os.path.join(base_path, raw_dir)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.csv'):
+                continue
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            shard_id = f"{raw_dir}/{name}"
+            previous = known.get(shard_id)
+            if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime:
+                sha256 = previous['sha256']
+            else:
+                sha256 = _file_sha256(path)
+            shards[shard_id] = {'dataset': dataset_type, 'size': stat.st_size,
+                                'mtime': stat.st_mtime, 'sha256': sha256}
+    return shards
+
+def load_manifest(base_path='.'):
+    path = os.path.join(base_path, PROCESSED_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest, base_path='.'):
+    path = os.path.join(base_path, PROCESSED_DIR, MANIFEST_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write-then-rename so notebooks running in parallel never read a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _manifest_lock(base_path='.', timeout=60):
+    """Serialise read-modify-write of the manifest across processes."""
+    return file_lock(os.path.join(base_path, PROCESSED_DIR, f"{MANIFEST_FILE}.lock"), timeout)
+
+def _update_manifest(base_path='.', **fields):
+    """Set manifest fields under the lock, re-reading it first so that table records other
+    processes stored in the meantime are kept."""
+    with _manifest_lock(base_path):
+        manifest = load_manifest(base_path)
+        manifest.update(fields)
+        save_manifest(manifest, base_path)
+
+def _aggregate_new_shards(new_shards, base_path, n_workers, chunksize=None):
+    """Per-day, per-key sums of only the new shards, shaped like the daily table.
+    
+    With `chunksize` set the shards are streamed chunk by chunk, as in build_master_data.
+    """
+    aggregates = []
+    for dataset_type in RAW_DIRS:
+        files = [os.path.join(base_path, shard_id) for shard_id, info in new_shards.items()
+                 if info['dataset'] == dataset_type]
+        if files and chunksize:
+            aggregates.append(stream_aggregate_shards(files, dataset_type, chunksize, DAILY_KEYS, base_path))
+        elif files:
+            aggregates.append(aggregate_by_key(read_csv_shards(files, dataset_type, n_workers, base_path=base_path),
+                                               DAILY_KEYS))
+        else:
+            aggregates.append(aggregate_by_key(empty_shard(dataset_type, base_path), DAILY_KEYS))
+    
+    delta = merge_aggregates(*aggregates, keys=DAILY_KEYS)
+    value_cols = [c for c in delta.columns if c not in DAILY_KEYS]
+    delta[value_cols] = delta[value_cols].astype('int64')
+    return delta
+
+def _full_rebuild(shards, base_path, n_workers, chunksize=None):
+    master = build_master_data(base_path, n_workers, chunksize)
+    # Every processed table must be derived in full after a rebuild, so none are recorded
+    with _manifest_lock(base_path):
+        save_manifest({'version': 1, 'shards': shards, 'tables': {}}, base_path)
+    delta_path = os.path.join(base_path, PROCESSED_DIR, f"{DELTA_NAME}.parquet")
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
+    return master
+
+def refresh_master_data(base_path='.', n_workers=1, full=False, chunksize=None):
+    """Bring the master table up to date with the raw shards, ingesting only new ones.
+    
+    New shards are aggregated on their own and added to the stored per-key sums. A shard
+    that changed or disappeared cannot be subtracted back out, so that triggers a full
+    rebuild, as does a missing manifest or master table. `chunksize` streams the shards
+    that are read (see build_master_data).
+    
+    The whole refresh runs under one lock, so notebooks refreshing in parallel wait for each
+    other and then find the shards already ingested instead of adding them twice.
+    """
+    os.makedirs(os.path.join(base_path, PROCESSED_DIR), exist_ok=True)
+    with file_lock(os.path.join(base_path, PROCESSED_DIR, REFRESH_LOCK_FILE), REFRESH_LOCK_TIMEOUT):
+        return _refresh(base_path, n_workers, full, chunksize)
+
+def _refresh(base_path, n_workers, full, chunksize):
+    manifest = load_manifest(base_path)
+    table_paths = [os.path.join(base_path, PROCESSED_DIR, f"{name}.parquet")
+                   for name in (MASTER_NAME, DAILY_NAME, MONTHLY_NAME)]
+    shards = scan_shards(base_path, manifest['shards'] if manifest else None)
+    
+    if full or manifest is None or not all(os.path.exists(p) for p in table_paths):
+        print("Full rebuild of the master table...")
+        return _full_rebuild(shards, base_path, n_workers, chunksize)
+    
+    known = manifest['shards']
+    changed = [s for s in known if s not in shards or shards[s]['sha256'] != known[s]['sha256']]
+    if changed:
+        print(f"{len(changed)} ingested shard(s) changed or were removed; rebuilding from scratch...")
+        return _full_rebuild(shards, base_path, n_workers, chunksize)
+    
+    new_shards = {s: info for s, info in shards.items() if s not in known}
+    if not new_shards:
+        print("No new raw shards; master table is up to date.")
+        # Pick up refreshed mtimes so unchanged files are not re-hashed next time
+        if shards != known:
+            _update_manifest(base_path, shards=shards)
+        return load_processed(MASTER_NAME, base_path=base_path)
+    
+    print(f"Ingesting {len(new_shards)} new shard(s)...")
+    delta = _aggregate_new_shards(new_shards, base_path, n_workers, chunksize)
+    
+    # Sums are additive: stack the delta under the stored daily totals and re-aggregate per
+    # day and key; the monthly and all-time tables are rolled up from the result
+    daily = load_processed(DAILY_NAME, base_path=base_path)
+    daily = aggregate_by_key(pd.concat(align_keys([daily, delta]), ignore_index=True), DAILY_KEYS)
+    master = save_rollups(daily, base_path)
+    
+    version = manifest['version'] + 1
+    # Stored as key dictionary codes, like the processed tables
+    touched = key_codes(delta[KEY_COLS].drop_duplicates())
+    touched['version'] = version
+    n_touched = len(touched)
+    delta_path = os.path.join(base_path, PROCESSED_DIR, f"{DELTA_NAME}.parquet")
+    if os.path.exists(delta_path):
+        # Logs written before the key dictionary hold names; decoding encodes those
+        log = key_codes(decode_keys(pd.read_parquet(delta_path), base_path))
+        # Versions every processed table has already absorbed are no longer needed
+        oldest = min(manifest['tables'].values(), default=manifest['version'])
+        touched = pd.concat([log[log['version'] > oldest], touched], ignore_index=True)
+    touched.to_parquet(delta_path, index=False)
+    
+    _update_manifest(base_path, version=version, shards=shards)
+    print(f"Master table updated to version {version} ({n_touched} keys touched)")
+    return master
+
+def pending_keys(name, base_path='.'):
+    """Keys whose master rows changed since processed table `name` was last written.
+    
+    Returns None when the table has to be derived in full (missing, or not written since the
+    last full rebuild), otherwise a possibly empty frame of state/district/pincode keys.
+    """
+    manifest = load_manifest(base_path)
+    table_path = os.path.join(base_path, PROCESSED_DIR, f"{name}.parquet")
+    if manifest is None or not os.path.exists(table_path):
+        return None
+    
+    table_version = manifest['tables'].get(name)
+    if table_version is None:
+        return None
+    if table_version >= manifest['version']:
+        return pd.DataFrame(columns=KEY_COLS)
+    
+    log = pd.read_parquet(os.path.join(base_path, PROCESSED_DIR, f"{DELTA_NAME}.parquet"))
+    return decode_keys(log.loc[log['version'] > table_version, KEY_COLS].drop_duplicates(), base_path)
+
+def _key_codes(df, key_cols):
+    # Dictionary codes are stable across frames, so keys compare as integers
+    return pd.MultiIndex.from_arrays([df[col].cat.codes if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col]
+                                      for col in key_cols])
+
+def restrict_to_keys(df, keys, key_cols=KEY_COLS):
+    """Rows of df whose key_cols appear in keys; everything when keys is None."""
+    if keys is None:
+        return df
+    if not len(keys):
+        return df.iloc[:0]
+    return df[_key_codes(df, key_cols).isin(_key_codes(keys, key_cols))]
+
+def upsert_processed(df, name, base_path='.', keys=None, key_cols=KEY_COLS):
+    """Save a processed table, replacing only the rows for `keys` when given.
+    
+    `df` holds the re-derived rows for every key_cols value in `keys` (all rows when keys
+    is None). The table is recorded in the manifest as current with the master version.
+    """
+    if keys is None:
+        save_processed(df, name, base_path)
+    elif len(keys):
+        existing = load_processed(name, base_path=base_path)
+        new_cols = [c for c in df.columns if c not in existing.columns]
+        if new_cols:
+            raise ValueError(f"{name} gained columns {new_cols}; derive it in full first "
+                             f"(invalidate_table('{name}') or python -m utils.incremental --full)")
+        kept = existing.drop(restrict_to_keys(existing, keys, key_cols).index)
+        combined = encode_keys(pd.concat(align_keys([kept, encode_keys(df.copy(), base_path, extend=True)]), ignore_index=True),
+                               base_path, extend=True)
+        combined = combined.sort_values(KEY_COLS, ignore_index=True)
+        save_processed(combined[existing.columns], name, base_path)
+    
+    with _manifest_lock(base_path):
+        manifest = load_manifest(base_path)
+        if manifest is not None:
+            manifest['tables'][name] = manifest['version']
+            save_manifest(manifest, base_path)
+
+def invalidate_table(name, base_path='.'):
+    """Forget that processed table `name` is current, so it is next derived in full.
+    
+    Needed when the derivation itself changes, which the delta log cannot see.
+    """
+    with _manifest_lock(base_path):
+        manifest = load_manifest(base_path)
+        if manifest is not None and manifest['tables'].pop(name, None) is not None:
+            save_manifest(manifest, base_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest new raw shards into the master table.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Number of shards parsed concurrently (default: all cores)")
+    parser.add_argument('--full', action='store_true', help="Ignore the manifest and rebuild from scratch")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream shards in chunks of this many rows instead of loading them whole")
+    args = parser.parse_args()
+    refresh_master_data(n_workers=args.workers, full=args.full, chunksize=args.chunksize)
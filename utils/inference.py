@@ -0,0 +1,337 @@
+import pandas as pd
+import numpy as np
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+import joblib
+import sklearn
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.data_loader import PROCESSED_DIR
+
+# Models written by notebooks/analysis/10_ml_training.py
+MODEL_DIR = 'models'
+MODEL_FILES = {
+    'demand': 'demand_forecaster.joblib',
+    'infra': 'infra_optimizer.joblib',
+    'spike': 'spike_warning.joblib'
+}
+ENCODER_FILE = 'state_encoder.joblib'
+ARTIFACTS = {**MODEL_FILES, 'state_encoder': ENCODER_FILE}
+
+# Modules unpickling the artifacts imports; preload() imports them before starting threads,
+# which would otherwise race on the first import
+ARTIFACT_MODULES = ['sklearn.ensemble', 'sklearn.linear_model', 'sklearn.preprocessing']
+
+# Records every artifact's file stats, scikit-learn version and training inputs, so stale
+# models are found without unpickling anything
+MANIFEST_FILE = 'manifest.json'
+
+# Processed tables each artifact is trained on
+ARTIFACT_INPUTS = {
+    'demand': ['monthly_pincode_data'],
+    'infra': ['geographic_data'],
+    'spike': ['anomaly_detection_data'],
+    'state_encoder': ['monthly_pincode_data']
+}
+
+# Feature columns, in training order
+FEATURES = {
+    'demand': ['state_enc', 'pop_millions', 'year', 'total_enrollments'],
+    'infra': ['state_enc', 'pop_millions', 'total_updates'],
+    'spike': ['enr_z_score', 'demo_z_score', 'total_enrollments']
+}
+
+# Inputs are rounded to these decimals before predicting, so nearby widget values share a
+# cache entry and batched and single-row predictions agree
+ROUNDING = {
+    'pop_millions': 2,
+    'year': 2,
+    'total_enrollments': 0,
+    'total_updates': 0,
+    'enr_z_score': 2,
+    'demo_z_score': 2
+}
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_PORT = 8765
+
+def inputs_fingerprint(tables, base_path='.'):
+    """SHA-256 over the content of the processed tables (Parquet, else the legacy CSV)."""
+    digest = hashlib.sha256()
+    for name in tables:
+        path = os.path.join(base_path, PROCESSED_DIR, f"{name}.parquet")
+        if not os.path.exists(path):
+            path = os.path.join(base_path, PROCESSED_DIR, f"{name}.csv")
+        digest.update(name.encode('utf-8'))
+        if not os.path.exists(path):
+            digest.update(b'<missing>')
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def save_artifact(obj, name, model_dir=MODEL_DIR, base_path='.', **info):
+    """Write an artifact uncompressed, so its arrays can be memory-mapped on load.
+    
+    Returns its manifest entry, extended with `info` (e.g. training stats); pass the entries
+    of a training run to write_manifest.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, ARTIFACTS[name])
+    joblib.dump(obj, path)
+    stat = os.stat(path)
+    return {
+        'file': ARTIFACTS[name],
+        'bytes': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'mmap': True,
+        'sklearn': sklearn.__version__,
+        'inputs': inputs_fingerprint(ARTIFACT_INPUTS[name], base_path),
+        'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        **info
+    }
+
+def load_manifest(model_dir=MODEL_DIR):
+    path = os.path.join(model_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_manifest(entries, model_dir=MODEL_DIR):
+    """Merge {artifact: entry} into the manifest (atomically replaced)."""
+    manifest = {**load_manifest(model_dir), **entries}
+    path = os.path.join(model_dir, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def artifacts_version(model_dir=MODEL_DIR):
+    """File stats of every artifact on disk; changes whenever training rewrites one, so caches
+    of predictions can be keyed on it (nothing is read or unpickled)."""
+    version = []
+    for name, file in ARTIFACTS.items():
+        path = os.path.join(model_dir, file)
+        stat = os.stat(path) if os.path.exists(path) else None
+        version.append((name, stat and stat.st_size, stat and stat.st_mtime_ns))
+    return tuple(version)
+
+def check_artifacts(model_dir=MODEL_DIR, base_path='.'):
+    """Return {artifact: reason} for every artifact that is missing or stale.
+    
+    Only file stats and hashes of the training tables are compared; nothing is unpickled.
+    """
+    manifest = load_manifest(model_dir)
+    fingerprints = {}
+    problems = {}
+    for name, file in ARTIFACTS.items():
+        path = os.path.join(model_dir, file)
+        entry = manifest.get(name)
+        if not os.path.exists(path):
+            problems[name] = 'missing'
+        elif entry is None:
+            problems[name] = 'not in the manifest (saved by an older training script)'
+        elif os.stat(path).st_size != entry['bytes'] or os.stat(path).st_mtime_ns != entry['mtime_ns']:
+            problems[name] = 'file changed since training'
+        elif entry['sklearn'] != sklearn.__version__:
+            problems[name] = f"trained with scikit-learn {entry['sklearn']}, running {sklearn.__version__}"
+        else:
+            tables = tuple(ARTIFACT_INPUTS[name])
+            if tables not in fingerprints:
+                fingerprints[tables] = inputs_fingerprint(tables, base_path)
+            if fingerprints[tables] != entry['inputs']:
+                problems[name] = 'training data changed since training'
+    return problems
+
+class InferenceService:
+    """Batched, memoized predictions from the trained models.
+    
+    Rows may give `state` (a name) instead of `state_enc`. predict() scores many rows in one
+    call; predict_one() serves a single row from an LRU cache keyed on the rounded inputs.
+    The spike model returns the probability of a spike, the others their prediction.
+    
+    Artifacts load on first use (preload() loads several in parallel); those the manifest
+    marks as uncompressed are memory-mapped.
+    """
+    def __init__(self, model_dir=MODEL_DIR, cache_size=DEFAULT_CACHE_SIZE):
+        self.model_dir = model_dir
+        self.manifest = load_manifest(model_dir)
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self._state_codes = None
+        self._cached = lru_cache(maxsize=cache_size)(self._predict_key)
+    
+    def _path(self, name):
+        return os.path.join(self.model_dir, ARTIFACTS[name])
+    
+    def _load(self, name):
+        path = self._path(name)
+        entry = self.manifest.get(name, {})
+        # Only files the manifest knows are uncompressed; memory-mapping a compressed one fails
+        stat = os.stat(path)
+        mmap = entry.get('mmap') and (stat.st_size, stat.st_mtime_ns) == (entry.get('bytes'), entry.get('mtime_ns'))
+        return joblib.load(path, mmap_mode='r' if mmap else None)
+    
+    def artifact(self, name):
+        if name not in self._loaded:
+            obj = self._load(name)
+            with self._lock:
+                self._loaded.setdefault(name, obj)
+        return self._loaded[name]
+    
+    def preload(self, names=None):
+        """Load the given artifacts (default: all present) concurrently."""
+        names = [n for n in (names or ARTIFACTS) if n not in self._loaded and os.path.exists(self._path(n))]
+        if not names:
+            return
+        for module in ARTIFACT_MODULES:
+            importlib.import_module(module)
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            for name, obj in zip(names, executor.map(self._load, names)):
+                with self._lock:
+                    self._loaded.setdefault(name, obj)
+    
+    def stale(self, base_path='.'):
+        return check_artifacts(self.model_dir, base_path)
+    
+    @property
+    def state_codes(self):
+        if self._state_codes is None:
+            if not os.path.exists(self._path('state_encoder')):
+                return {}
+            self._state_codes = {s: i for i, s in enumerate(self.artifact('state_encoder').classes_)}
+        return self._state_codes
+    
+    @property
+    def states(self):
+        return sorted(self.state_codes)
+    
+    def available(self, name):
+        return name in MODEL_FILES and os.path.exists(self._path(name))
+    
+    def _features(self, name, rows):
+        if name not in FEATURES:
+            raise ValueError(f"Unknown model '{name}', expected one of {list(FEATURES)}")
+        if not self.available(name):
+            raise FileNotFoundError(f"Model '{name}' not found in {self.model_dir}/; run 10_ml_training.py first")
+        df = pd.DataFrame(rows)
+        if 'state_enc' in FEATURES[name] and 'state_enc' not in df.columns:
+            codes = df['state'].map(self.state_codes)
+            if codes.isna().any():
+                raise ValueError(f"Unknown state(s): {sorted(df.loc[codes.isna(), 'state'].unique())}")
+            df['state_enc'] = codes.astype('int64')
+        missing = [col for col in FEATURES[name] if col not in df.columns]
+        if missing:
+            raise ValueError(f"Model '{name}' needs {missing}")
+        X = df[FEATURES[name]].astype('float64')
+        return X.round({col: ROUNDING[col] for col in X.columns if col in ROUNDING})
+    
+    def _predict_frame(self, name, X):
+        model = self.artifact(name)
+        if name == 'spike':
+            return model.predict_proba(X)[:, 1]
+        return model.predict(X)
+    
+    def predict(self, name, rows):
+        """Score every row (a DataFrame or a list of dicts) in one vectorized call."""
+        return self._predict_frame(name, self._features(name, rows))
+    
+    def _predict_key(self, name, key):
+        X = pd.DataFrame([key], columns=FEATURES[name])
+        return float(self._predict_frame(name, X)[0])
+    
+    def predict_one(self, name, **features):
+        # Build the cache key without pandas so a hit costs microseconds
+        if name not in FEATURES or not self.available(name):
+            self._features(name, [features])
+        if 'state_enc' in FEATURES[name] and 'state_enc' not in features:
+            if features.get('state') not in self.state_codes:
+                raise ValueError(f"Unknown state(s): {[features.get('state')]}")
+            features = {**features, 'state_enc': self.state_codes[features['state']]}
+        missing = [col for col in FEATURES[name] if col not in features]
+        if missing:
+            raise ValueError(f"Model '{name}' needs {missing}")
+        key = tuple(float(np.round(float(features[col]), ROUNDING[col])) if col in ROUNDING else float(features[col])
+                    for col in FEATURES[name])
+        return self._cached(name, key)
+    
+    def cache_info(self):
+        return self._cached.cache_info()
+    
+    def projection_grid(self, state_inputs, years):
+        """Demand for every state in every year, in one batched call.
+        
+        `state_inputs` is a DataFrame with state, pop_millions and total_enrollments per
+        state. Returns one row per (state, year) with the predicted updates in `predicted`.
+        """
+        grid = state_inputs.merge(pd.DataFrame({'year': list(years)}), how='cross')
+        grid['predicted'] = self.predict('demand', grid)
+        return grid
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def do_GET(self):
+            if self.path.rstrip('/') == '/health':
+                self._reply(200, {'models': {name: service.available(name) for name in MODEL_FILES},
+                                  'states': service.states})
+            else:
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+        
+        def do_POST(self):
+            # POST /predict/<model> with {"rows": [{feature: value, ...}, ...]}
+            parts = self.path.strip('/').split('/')
+            if len(parts) != 2 or parts[0] != 'predict':
+                self._reply(404, {'error': f"Unknown path {self.path}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                predictions = service.predict(parts[1], body['rows'])
+            except (KeyError, ValueError, TypeError) as e:
+                self._reply(400, {'error': str(e)})
+                return
+            except FileNotFoundError as e:
+                self._reply(404, {'error': str(e)})
+                return
+            self._reply(200, {'model': parts[1], 'predictions': [float(p) for p in predictions]})
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+def serve(service=None, host='127.0.0.1', port=DEFAULT_PORT):
+    """Serve GET /health and POST /predict/<model> over HTTP until interrupted."""
+    service = service or InferenceService()
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    print(f"Serving models on http://{host}:{port} (POST /predict/<{'|'.join(MODEL_FILES)}>)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the trained models over a local HTTP endpoint.")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: localhost only)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    args = parser.parse_args()
+    serve(InferenceService(args.model_dir), args.host, args.port)
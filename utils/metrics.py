@@ -0,0 +1,82 @@
+import pandas as pd
+import numpy as np
+
+# Composite columns derived from the per-pincode counts, shared by the preprocessing
+# notebooks, the analysis notebooks, the dashboard and the chart scripts so every consumer
+# uses the same formula. A 'sum' adds its inputs; a 'ratio' divides its first input by the
+# second plus 1, so areas without any activity do not divide by zero. Inputs may be other
+# metrics; entries are in dependency order.
+METRICS = {
+    'total_enrollments': ('sum', ['age_0_5', 'age_5_17', 'age_18_greater']),
+    'total_demo_updates': ('sum', ['demo_age_5_17', 'demo_age_17_']),
+    'total_bio_updates': ('sum', ['bio_age_5_17', 'bio_age_17_']),
+    'total_updates': ('sum', ['total_demo_updates', 'total_bio_updates']),
+    'total_activity': ('sum', ['total_enrollments', 'total_updates']),
+    'update_to_enrollment_ratio': ('ratio', ['total_updates', 'total_enrollments']),
+    'update_intensity': ('ratio', ['total_updates', 'total_enrollments']),
+    'child_enr_share': ('ratio', ['age_0_5', 'total_enrollments']),
+    'update_type_index': ('ratio', ['total_demo_updates', 'total_bio_updates'])
+}
+
+def _plan(df, names):
+    """Metrics that must be computed for `names`, in registry order.
+    
+    Columns df already has (metrics loaded from a processed table) are reused, not derived.
+    """
+    needed = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in needed or name in df.columns:
+            continue
+        if name not in METRICS:
+            raise KeyError(f"'{name}' is neither a column nor a registered metric")
+        needed.add(name)
+        pending.extend(METRICS[name][1])
+    return [name for name in METRICS if name in needed]
+
+def compute_metrics(df, names):
+    """The named metrics of df's rows as a new frame (df is not modified).
+    
+    Everything is computed in one pass over two preallocated blocks, one for the sums and
+    one for the ratios; intermediate metrics are computed once and only the named ones
+    are returned.
+    """
+    plan = _plan(df, names)
+    sums = [name for name in plan if METRICS[name][0] == 'sum']
+    ratios = [name for name in plan if METRICS[name][0] == 'ratio']
+    arrays = {col: df[col].to_numpy() for name in plan for col in METRICS[name][1] if col in df.columns}
+    arrays.update({name: df[name].to_numpy() for name in names if name in df.columns})
+    
+    # Sums of count columns stay integer, widened so large totals cannot overflow
+    sum_block = np.empty((len(sums), len(df)), dtype=np.result_type('int64', *[a.dtype for a in arrays.values()]))
+    ratio_block = np.empty((len(ratios), len(df)), dtype='float64')
+    for name in plan:
+        op, inputs = METRICS[name]
+        if op == 'sum':
+            out = sum_block[sums.index(name)]
+            np.add(arrays[inputs[0]], arrays[inputs[1]], out=out, dtype=out.dtype)
+            for col in inputs[2:]:
+                np.add(out, arrays[col], out=out)
+        else:
+            out = ratio_block[ratios.index(name)]
+            np.add(arrays[inputs[1]], 1, out=out, dtype=out.dtype)
+            np.divide(arrays[inputs[0]], out, out=out)
+        arrays[name] = out
+    
+    # The blocks become the result's columns as they are; only reused columns are copied
+    frames = [pd.DataFrame(block.T, index=df.index, columns=cols, copy=False)
+              for block, cols in ((sum_block, sums), (ratio_block, ratios)) if cols]
+    reused = [name for name in names if name in df.columns]
+    if reused:
+        frames.append(df[reused])
+    result = pd.concat(frames, axis=1, copy=False)
+    return result if list(result.columns) == list(names) else result[list(names)]
+
+def add_metrics(df, names):
+    """Add the named metrics df does not have yet as columns, in place, and return df."""
+    missing = [name for name in names if name not in df.columns]
+    if missing:
+        for name, values in compute_metrics(df, missing).items():
+            df[name] = values
+    return df
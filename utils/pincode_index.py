@@ -0,0 +1,96 @@
+import pandas as pd
+import numpy as np
+
+from utils.data_loader import PINCODE_WIDTH
+
+# Drill-down lookups over a per-pincode rollup for the dashboard. The rows are sorted once
+# by state, district and pincode, so every state and district is one contiguous run of rows,
+# found through a dict of row ranges; pincodes are found by binary search in a sorted copy of
+# the pincode column, which also answers prefixes (the leading digits name the postal
+# region, circle and sorting district).
+
+def _changes(codes):
+    """True where a run of equal codes starts."""
+    return np.r_[True, codes[1:] != codes[:-1]][:len(codes)]
+
+def _runs(starts):
+    bounds = np.append(np.flatnonzero(starts), len(starts))
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+class PincodeIndex:
+    """Rows of df by state, district or pincode (prefix), without scanning the frame.
+    
+    State and district lookups are hashed and return views (iloc slices) of the sorted
+    frame; pincode and name searches are O(log n) and gather just the matching rows.
+    """
+    def __init__(self, df, state_col='state_clean', district_col='district', pincode_col='pincode'):
+        states = df[state_col].astype('category')
+        districts = df[district_col].astype('category')
+        pincodes = df[pincode_col].to_numpy()
+        order = np.lexsort((pincodes, districts.cat.codes.to_numpy(), states.cat.codes.to_numpy()))
+        self.frame = df.iloc[order].reset_index(drop=True)
+        
+        # Row ranges of each state and (state, district) run in the sorted frame; rows without
+        # a state or district (code -1) are not indexed
+        state_codes = states.cat.codes.to_numpy()[order]
+        district_codes = districts.cat.codes.to_numpy()[order]
+        new_state = _changes(state_codes)
+        self._states = {states.cat.categories[state_codes[start]]: (start, stop)
+                        for start, stop in _runs(new_state) if state_codes[start] >= 0}
+        self._districts = {(states.cat.categories[state_codes[start]], districts.cat.categories[district_codes[start]]): (start, stop)
+                           for start, stop in _runs(new_state | _changes(district_codes))
+                           if state_codes[start] >= 0 and district_codes[start] >= 0}
+        self._state_districts = {}
+        for state, district in self._districts:
+            self._state_districts.setdefault(state, []).append(district)
+        
+        # Sorted pincodes and the frame row of each, for exact and prefix searches
+        pins = self.frame[pincode_col].to_numpy()
+        self._pin_rows = np.argsort(pins, kind='stable')
+        self._pins = pins[self._pin_rows]
+        
+        # Lowercased district names, sorted, for prefix search by name
+        names = sorted((str(district).lower(), (state, district)) for state, district in self._districts)
+        self._names = np.array([name for name, _ in names], dtype=object)
+        self._name_keys = [key for _, key in names]
+    
+    def __len__(self):
+        return len(self.frame)
+    
+    def states(self):
+        return sorted(self._states)
+    
+    def districts(self, state):
+        return sorted(self._state_districts.get(state, []))
+    
+    def state(self, state):
+        """Rows of one state (a view; empty if unknown)."""
+        start, stop = self._states.get(state, (0, 0))
+        return self.frame.iloc[start:stop]
+    
+    def district(self, state, district):
+        """Rows of one district of a state (a view; empty if unknown)."""
+        start, stop = self._districts.get((state, district), (0, 0))
+        return self.frame.iloc[start:stop]
+    
+    def pincode(self, prefix):
+        """Rows whose pincode starts with the digits of `prefix` (all PINCODE_WIDTH of them for
+        one pincode), in state, district and pincode order."""
+        digits = str(prefix).strip()
+        if not digits.isdigit() or len(digits) > PINCODE_WIDTH:
+            raise ValueError(f"'{prefix}' is not a pincode or pincode prefix")
+        scale = 10 ** (PINCODE_WIDTH - len(digits))
+        lo, hi = np.searchsorted(self._pins, [int(digits) * scale, (int(digits) + 1) * scale])
+        return self.frame.iloc[np.sort(self._pin_rows[lo:hi])]
+    
+    def search(self, query):
+        """Rows matching the search box: a pincode prefix if `query` is up to PINCODE_WIDTH
+        digits, otherwise every district whose name starts with it (case-insensitive)."""
+        query = str(query).strip()
+        if query.isdigit() and len(query) <= PINCODE_WIDTH:
+            return self.pincode(query)
+        lo, hi = np.searchsorted(self._names, [query.lower(), query.lower() + '\uffff'])
+        keys = sorted(set(self._name_keys[lo:hi]), key=lambda key: self._districts[key])
+        if not keys:
+            return self.frame.iloc[0:0]
+        return pd.concat([self.district(*key) for key in keys])
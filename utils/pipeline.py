@@ -0,0 +1,255 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.geo import GEO_MANIFEST
+from utils.incremental import invalidate_table
+from utils.population import POPULATION_FILE
+from utils.run_notebook import NotebookPool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Input fingerprints of the last successful run of every node, plus its timing
+STATE_FILE = os.path.join('processed_data', 'pipeline_state.json')
+
+# (notebook, processed table it writes)
+PREPROCESSING = [
+    ('01_geographic_preprocessing', 'geographic_data'),
+    ('02_age_demographics_preprocessing', 'age_demographics_data'),
+    ('03_update_behavior_preprocessing', 'update_behavior_data'),
+    ('04_anomaly_detection_preprocessing', 'anomaly_detection_data'),
+    ('05_predictive_analytics_preprocessing', 'predictive_data'),
+    ('06_pincode_analysis_preprocessing', 'pincode_data')
+]
+
+# Project modules holding part of a notebook's logic
+NOTEBOOK_MODULES = {
+    '01_geographic_preprocessing': ['utils/metrics.py'],
+    '03_update_behavior_preprocessing': ['utils/metrics.py'],
+    '04_anomaly_detection_preprocessing': ['utils/anomaly.py', 'utils/metrics.py'],
+    '05_predictive_analytics_preprocessing': ['utils/metrics.py'],
+    '06_pincode_analysis_analysis': ['utils/metrics.py'],
+    '07_advanced_insights_analysis': ['utils/metrics.py'],
+    '09_population_ratio_heatmaps': ['utils/metrics.py', 'utils/population.py']
+}
+
+# (notebook, processed tables it reads)
+ANALYSIS = [
+    ('01_geographic_analysis', ['geographic_data']),
+    ('02_age_demographics_analysis', ['age_demographics_data']),
+    ('03_update_behavior_analysis', ['update_behavior_data']),
+    ('04_anomaly_detection_analysis', ['anomaly_detection_data']),
+    ('05_predictive_analytics_analysis', ['predictive_data']),
+    ('06_pincode_analysis_analysis', ['pincode_data']),
+    ('07_advanced_insights_analysis', ['pincode_data']),
+    ('08_geographic_heatmaps', ['geographic_data']),
+    ('09_population_ratio_heatmaps', ['geographic_data'])
+]
+
+# Non-table files an analysis notebook reads
+NOTEBOOK_ASSETS = {
+    '08_geographic_heatmaps': [GEO_MANIFEST],
+    '09_population_ratio_heatmaps': [GEO_MANIFEST, POPULATION_FILE]
+}
+
+def _table_path(name):
+    return os.path.join('processed_data', f"{name}.parquet")
+
+def build_pipeline(chunksize=None):
+    """Return the pipeline nodes in a valid topological order.
+    
+    Each node has either a `notebook` (run on the warm notebook pool, optionally writing a
+    `summary`) or a `cmd` run from the repository root in its own process, the `after`
+    nodes it waits for, and the `inputs` whose content decides whether it can be skipped
+    (None means the node always runs). Preprocessing nodes also name the `table` they
+    upsert and the `code` that derives it; when that code changes the table is re-derived
+    in full. `chunksize` makes ingestion stream the raw shards in chunks of that many rows.
+    """
+    python = sys.executable
+    nodes = [{
+        'name': 'ingest',
+        # Does its own change detection against the shard manifest
+        'cmd': [python, '-m', 'utils.incremental'] + (['--chunksize', str(chunksize)] if chunksize else []),
+        'inputs': None,
+        'after': []
+    }, {
+        'name': 'geo',
+        # Builds the local boundary store once (fetching it needs network; offline it warns
+        # and the choropleths are skipped)
+        'cmd': [python, '-m', 'utils.geo', '--ensure'],
+        'inputs': None,
+        'after': []
+    }]
+    producers = {}
+    for notebook, table in PREPROCESSING:
+        path = f"notebooks/preprocessing/{notebook}.ipynb"
+        code = [path] + NOTEBOOK_MODULES.get(notebook, [])
+        nodes.append({
+            'name': f"preprocessing/{notebook}",
+            'notebook': path,
+            'table': table,
+            'code': code,
+            'inputs': code + [_table_path('master_pincode_data')],
+            'after': ['ingest']
+        })
+        producers[table] = f"preprocessing/{notebook}"
+    for notebook, tables in ANALYSIS:
+        path = f"notebooks/analysis/{notebook}.ipynb"
+        nodes.append({
+            'name': f"analysis/{notebook}",
+            # The notebook's printed insights go to analysis_results in the same run
+            'notebook': path,
+            'summary': os.path.join('analysis_results', f"{notebook}_summary.txt"),
+            'inputs': [path] + NOTEBOOK_MODULES.get(notebook, []) + [_table_path(t) for t in tables]
+                      + NOTEBOOK_ASSETS.get(notebook, []),
+            'after': [producers[t] for t in tables] + (['geo'] if GEO_MANIFEST in NOTEBOOK_ASSETS.get(notebook, []) else [])
+        })
+    nodes.append({
+        'name': 'cube',
+        # Dashboard rollups of every processed table
+        'cmd': [python, '-m', 'utils.cube'],
+        'inputs': ['utils/cube.py', 'utils/population.py', POPULATION_FILE] + [_table_path(table) for _, table in PREPROCESSING],
+        'after': list(producers.values())
+    })
+    ml_tables = ['geographic_data', 'anomaly_detection_data']
+    nodes.append({
+        'name': 'analysis/10_ml_training',
+        'cmd': [python, 'notebooks/analysis/10_ml_training.py'],
+        # The monthly rollup is written by ingestion itself
+        'inputs': ['notebooks/analysis/10_ml_training.py', 'utils/metrics.py', 'utils/population.py', POPULATION_FILE,
+                   _table_path('monthly_pincode_data')]
+                  + [_table_path(t) for t in ml_tables],
+        'after': ['ingest'] + [producers[t] for t in ml_tables]
+    })
+    return nodes
+
+def fingerprint(paths):
+    """SHA-256 over the content of every input file (missing files hash as missing)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode('utf-8'))
+        full_path = os.path.join(ROOT, path)
+        if not os.path.exists(full_path):
+            digest.update(b'<missing>')
+            continue
+        with open(full_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def load_state():
+    path = os.path.join(ROOT, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state):
+    path = os.path.join(ROOT, STATE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+def _run_command(cmd):
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    return result.returncode == 0, time.perf_counter() - start, result.stdout + result.stderr
+
+def _submit(node, executor, notebook_pool):
+    if 'notebook' not in node:
+        return executor.submit(_run_command, node['cmd'])
+    # Pool workers share this process's cwd, so hand them paths relative to it
+    summary = node.get('summary')
+    return notebook_pool.submit(os.path.relpath(os.path.join(ROOT, node['notebook'])),
+                                summary and os.path.join(ROOT, summary))
+
+def run_pipeline(nodes=None, max_workers=None, force=False):
+    """Run the DAG, starting every node as soon as the nodes it waits for have succeeded.
+    
+    A node is skipped when its input fingerprint matches the last successful run (unless
+    `force`). Nodes downstream of a failure are not started. Returns {name: (status, seconds)}.
+    """
+    nodes = nodes or build_pipeline()
+    max_workers = max_workers or os.cpu_count() or 1
+    state = load_state()
+    pending = {node['name']: node for node in nodes}
+    report = {}
+    running = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, NotebookPool(max_workers) as notebook_pool:
+        while pending or running:
+            progressed = False
+            for name, node in list(pending.items()):
+                statuses = [report.get(dep, (None,))[0] for dep in node['after']]
+                if any(s in ('failed', 'blocked') for s in statuses):
+                    report[name] = ('blocked', 0.0)
+                    del pending[name]
+                    progressed = True
+                    print(f"[blocked] {name}")
+                elif all(s in ('ok', 'skipped') for s in statuses):
+                    del pending[name]
+                    progressed = True
+                    inputs_hash = fingerprint(node['inputs']) if node['inputs'] is not None else None
+                    if not force and inputs_hash is not None and state.get(name, {}).get('inputs') == inputs_hash:
+                        report[name] = ('skipped', 0.0)
+                        print(f"[skipped] {name} (inputs unchanged)")
+                        continue
+                    code_hash = fingerprint(node['code']) if 'code' in node else None
+                    if code_hash is not None and state.get(name, {}).get('code') != code_hash:
+                        # New derivation logic: re-derive every key, not just the newly ingested ones
+                        invalidate_table(node['table'], ROOT)
+                    print(f"[start] {name}")
+                    running[_submit(node, executor, notebook_pool)] = (node, inputs_hash, code_hash)
+            
+            if not running:
+                if pending and not progressed:
+                    raise ValueError(f"Unsatisfiable dependencies for: {sorted(pending)}")
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                node, inputs_hash, code_hash = running.pop(future)
+                try:
+                    success, seconds, output = future.result()
+                except Exception as e:
+                    # e.g. a notebook worker died outright
+                    success, seconds, output = False, 0.0, repr(e)
+                if success:
+                    report[node['name']] = ('ok', seconds)
+                    state[node['name']] = {'inputs': inputs_hash, 'code': code_hash, 'seconds': round(seconds, 2)}
+                    save_state(state)
+                    print(f"[done] {node['name']} ({seconds:.1f}s)")
+                else:
+                    report[node['name']] = ('failed', seconds)
+                    print(f"[failed] {node['name']} ({seconds:.1f}s)")
+                    print(output[-4000:])
+    
+    return report
+
+def print_report(report):
+    print("")
+    print(f"{'Node':<55} {'Status':<8} {'Seconds':>8}")
+    print("-" * 73)
+    for name, (status, seconds) in report.items():
+        print(f"{name:<55} {status:<8} {seconds:>8.1f}")
+    print("-" * 73)
+    print(f"{'Total node time':<64} {sum(s for _, s in report.values()):>8.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the preprocessing and analysis pipeline as a DAG.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Maximum number of nodes running at once (default: all cores)")
+    parser.add_argument('--force', action='store_true', help="Run every node even if its inputs are unchanged")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Ingest raw shards in chunks of this many rows instead of loading them whole")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    report = run_pipeline(build_pipeline(args.chunksize), max_workers=args.workers, force=args.force)
+    print_report(report)
+    print(f"Wall-clock: {time.perf_counter() - start:.1f}s")
+    sys.exit(0 if all(status in ('ok', 'skipped') for status, _ in report.values()) else 1)
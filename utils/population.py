@@ -0,0 +1,44 @@
+import pandas as pd
+import numpy as np
+import os
+from functools import lru_cache
+
+from utils.metrics import add_metrics
+
+# Reference population of every state/UT in millions (UIDAI/Census projections for 2024),
+# shared by the notebooks, the dashboard and model training. Names are the cleaned state
+# names (see utils/cube.clean_state). The cube's data version covers this file, so editing it
+# rebuilds the penetration rollups and refreshes the dashboard caches.
+POPULATION_FILE = os.path.join('assets', 'reference', 'state_population.csv')
+
+@lru_cache(maxsize=4)
+def _read_population(path, mtime_ns):
+    return pd.read_csv(path, index_col='state')['population_millions']
+
+def load_population(base_path='.'):
+    """Population in millions per state name (read once per file version)."""
+    path = os.path.abspath(os.path.join(base_path, POPULATION_FILE))
+    return _read_population(path, os.stat(path).st_mtime_ns)
+
+def population_of(states, base_path='.'):
+    """Population in millions of every entry of `states` (NaN where unknown), as an array.
+    
+    States are joined as categoricals: each category is looked up once and the result is
+    gathered by code, so a column encoded against the key dictionary joins on its codes.
+    """
+    states = pd.Series(states).astype('category')
+    lookup = load_population(base_path).reindex(states.cat.categories.astype(str)).to_numpy()
+    # Missing states have code -1, which picks the trailing NaN
+    return np.append(lookup, np.nan)[states.cat.codes.to_numpy()]
+
+def add_penetration(df, state_col='state_clean', base_path='.'):
+    """Add population_millions and, with both activity totals present, total_activity and
+    activity_per_1000; in place.
+    
+    Rows of states without a reference population get NaN.
+    """
+    df['population_millions'] = population_of(df[state_col], base_path)
+    if 'total_enrollments' in df.columns and 'total_updates' in df.columns:
+        add_metrics(df, ['total_activity'])
+        df['activity_per_1000'] = (df['total_activity'] / (df['population_millions'] * 1000000)) * 1000
+    return df
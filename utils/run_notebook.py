@@ -1,38 +1,212 @@
 import nbformat
+import argparse
+import importlib
+import io
+import multiprocessing
 import sys
 import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def run_notebook(notebook_path):
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries the notebooks import; a warm worker pays for them once instead of per notebook
+WARM_IMPORTS = ['pandas', 'numpy', 'matplotlib.pyplot', 'seaborn', 'plotly.express',
+                'sklearn.linear_model', 'utils.data_loader', 'utils.incremental']
+
+class _Tee(io.TextIOBase):
+    """Write to the real stream (if any) while keeping a copy for the summary file."""
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+    
+    def write(self, text):
+        if self.stream is not None:
+            self.stream.write(text)
+        return self.buffer.write(text)
+    
+    def flush(self):
+        if self.stream is not None:
+            self.stream.flush()
+
+def _disable_figure_output():
+    """Turn figure saving/showing into no-ops so only the printed insights are produced."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    
+    noop = lambda *args, **kwargs: None
+    plt.savefig = noop
+    plt.show = noop
+    Figure.savefig = noop
+    try:
+        import plotly.graph_objects as go
+        go.Figure.write_image = noop
+        go.Figure.write_html = noop
+        go.Figure.show = noop
+    except ImportError:
+        pass
+
+def _write_summary(summary_path, notebook_name, success, stdout, stderr):
+    os.makedirs(os.path.dirname(summary_path) or '.', exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        if success:
+            f.write(f"=== {notebook_name} Analytical Insights ===\n\n")
+            f.write(stdout)
+        else:
+            f.write(f"=== {notebook_name} Run Error ===\n\n")
+            f.write(stdout)
+            f.write("\nERROR:\n")
+            f.write(stderr)
+
+def _execute(notebook_path):
     print(f"Executing notebook: {notebook_path}")
     with open(notebook_path, 'r', encoding='utf-8') as f:
         nb = nbformat.read(f, as_version=4)
-
-    # Change directory to the notebook's directory so relative paths work
-    original_cwd = os.getcwd()
-    os.chdir(os.path.dirname(os.path.abspath(notebook_path)))
-    
-    # Global namespace for execution
-    globals_dict = {}
-    
-    for i, cell in enumerate(nb.cells):
-        if cell.cell_type == 'code':
-            print(f"Running cell {i+1}...")
-            source = "".join(cell.source)
-            try:
-                exec(source, globals_dict)
-            except Exception as e:
-                print(f"Error in cell {i+1}: {e}")
-                os.chdir(original_cwd)
-                return False
-    
-    os.chdir(original_cwd)
+    
+    import matplotlib
+    rc_params = matplotlib.rcParams.copy()
+    sys_path = list(sys.path)
+    
+    # Fresh globals per notebook. Relative paths resolve against NOTEBOOK_DIR rather than
+    # the cwd, so nothing here changes process-wide state that parallel runs could see.
+    globals_dict = {'NOTEBOOK_DIR': os.path.dirname(os.path.abspath(notebook_path))}
+    
+    try:
+        for i, cell in enumerate(nb.cells):
+            if cell.cell_type == 'code':
+                print(f"Running cell {i+1}...")
+                source = "".join(cell.source)
+                try:
+                    exec(source, globals_dict)
+                except Exception as e:
+                    print(f"Error in cell {i+1}: {e}")
+                    traceback.print_exc()
+                    return False
+    finally:
+        # Leave a warm worker as the next notebook expects to find it
+        sys.path[:] = sys_path
+        if 'matplotlib.pyplot' in sys.modules:
+            sys.modules['matplotlib.pyplot'].close('all')
+        matplotlib.rcParams.update(rc_params)
+    
     print("Notebook execution completed successfully.")
     return True
 
+def _run_captured(notebook_path, summary_path=None, echo=True):
+    """Run a notebook with its output captured. Returns (success, seconds, output)."""
+    start = time.perf_counter()
+    original = sys.stdout, sys.stderr
+    stdout = _Tee(sys.stdout if echo else None)
+    stderr = _Tee(sys.stderr if echo else None)
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        success = _execute(notebook_path)
+    finally:
+        sys.stdout, sys.stderr = original
+    
+    if summary_path:
+        _write_summary(summary_path, os.path.basename(notebook_path), success,
+                       stdout.buffer.getvalue(), stderr.buffer.getvalue())
+    return success, time.perf_counter() - start, stdout.buffer.getvalue() + stderr.buffer.getvalue()
+
+def run_notebook(notebook_path, summary_path=None, figures=True):
+    """Execute a notebook's code cells in this process.
+    
+    When `summary_path` is given, everything the notebook prints is also written there
+    (the analysis_results/*_summary.txt format). `figures=False` skips saving and showing
+    plots, for regenerating summaries only.
+    """
+    if not figures:
+        _disable_figure_output()
+    success, _, _ = _run_captured(notebook_path, summary_path)
+    return success
+
+def _warm_up(figures):
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import matplotlib
+    matplotlib.use('Agg')
+    if not figures:
+        _disable_figure_output()
+    for module in WARM_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+def _run_in_worker(notebook_path, summary_path):
+    return _run_captured(notebook_path, summary_path, echo=False)
+
+class NotebookPool:
+    """Long-lived worker processes that execute notebooks with their imports already loaded.
+    
+    Each notebook still gets its own globals; submit() returns a future resolving to
+    (success, seconds, output).
+    """
+    def __init__(self, n_workers=None, figures=True):
+        # Spawned rather than forked: callers such as the pipeline also run threads
+        self.executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_warm_up, initargs=(figures,),
+                                            mp_context=multiprocessing.get_context('spawn'))
+    
+    def submit(self, notebook_path, summary_path=None):
+        return self.executor.submit(_run_in_worker, notebook_path, summary_path)
+    
+    def shutdown(self):
+        self.executor.shutdown()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+def run_notebooks(notebook_paths, n_workers=1, summary_dir=None, figures=True):
+    """Run several notebooks, in this process when n_workers is 1, else on a NotebookPool.
+    
+    Returns {notebook_path: success}.
+    """
+    def summary_for(path):
+        if summary_dir is None:
+            return None
+        return os.path.join(summary_dir, os.path.basename(path).replace(".ipynb", "_summary.txt"))
+    
+    if n_workers == 1:
+        return {path: run_notebook(path, summary_for(path), figures) for path in notebook_paths}
+    
+    results = {}
+    with NotebookPool(n_workers, figures) as pool:
+        futures = {pool.submit(path, summary_for(path)): path for path in notebook_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            success, seconds, output = future.result()
+            results[path] = success
+            print(f"[{'done' if success else 'failed'}] {path} ({seconds:.1f}s)")
+            if not success:
+                print(output[-2000:])
+    return results
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python run_notebook.py <path_to_notebook>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Execute notebooks' code cells from the terminal.")
+    parser.add_argument('notebooks', nargs='+', help="Path(s) to .ipynb files")
+    parser.add_argument('--summary', default=None,
+                        help="Also write everything the notebook prints to this file (single notebook)")
+    parser.add_argument('--summary-dir', default=None,
+                        help="Write <notebook>_summary.txt for every notebook into this directory")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Warm worker processes running notebooks concurrently (default: 1, in-process)")
+    parser.add_argument('--no-figures', action='store_true',
+                        help="Do not save or show figures (summary regeneration only)")
+    args = parser.parse_args()
+    
+    if args.summary and len(args.notebooks) > 1:
+        parser.error("--summary takes a single notebook; use --summary-dir for several")
     
-    success = run_notebook(sys.argv[1])
+    if args.summary:
+        success = run_notebook(args.notebooks[0], summary_path=args.summary, figures=not args.no_figures)
+    else:
+        results = run_notebooks(args.notebooks, args.workers, args.summary_dir, figures=not args.no_figures)
+        success = all(results.values())
     sys.exit(0 if success else 1)